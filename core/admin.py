@@ -1,3 +1,180 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.functional import cached_property
 
-# Register your models here.
+from . import analytics, versioning
+from .models import Organization, Item, Claim, Notification
+from .archive import archive_batch, delete_items
+from .audit import log_activity
+
+# Admin for the large tables.
+# The changelist never runs an exact COUNT(*) over a whole table: unfiltered
+# lists use the database's row estimate and filtered/searched lists count at
+# most COUNT_CAP rows. Foreign keys are joined with list_select_related and
+# edited through raw id inputs, and bulk actions are single UPDATEs.
+
+ESTIMATE_THRESHOLD = 10000  # below this an exact count is cheap enough
+COUNT_CAP = 10000
+
+
+def estimated_rows(model, using):
+    # Row estimate from the table statistics, or None when unavailable
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = %s",
+                [table],
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_rows(queryset.model, queryset.db)
+            if estimate is not None and estimate > ESTIMATE_THRESHOLD:
+                return estimate
+            return super().count
+        # Search/filter results: COUNT(*) over a LIMITed subquery
+        return queryset.order_by()[:COUNT_CAP].count()
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-id',)
+
+
+@admin.register(Organization)
+class OrganizationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'slug', 'domain', 'db_alias', 'active')
+    search_fields = ('name', 'slug', 'domain')
+
+
+class ItemAdminForm(forms.ModelForm):
+    # 'version' rides along hidden, so saving a stale change form fails
+    # instead of overwriting someone else's write (core/versioning.py)
+    class Meta:
+        model = Item
+        fields = '__all__'
+        widgets = {'version': forms.HiddenInput()}
+
+    def clean(self):
+        cleaned = super().clean()
+        if self.instance.pk and cleaned.get('version') != self.instance.version:
+            raise forms.ValidationError('This item was changed by someone else; reload the page and try again')
+        return cleaned
+
+
+@admin.register(Item)
+class ItemAdmin(LargeTableAdmin):
+    form = ItemAdminForm
+    list_display = ('id', 'title', 'status', 'category', 'location', 'user', 'date_reported', 'views')
+    list_select_related = ('user',)
+    list_filter = ('organization', 'status')
+    # '=' and '^' lookups can use the id, title and users.email indexes; '%term%' could not
+    search_fields = ('=id', '^title', '=user__email')
+    search_help_text = 'Item id, start of the title, or the reporter\'s exact email'
+    date_hierarchy = 'date_reported'
+    raw_id_fields = ('user',)
+    readonly_fields = ('date_reported', 'updated_at', 'image_hash')
+    actions = ('mark_recovered', 'archive_items')
+
+    @admin.action(description='Mark selected items as recovered')
+    def mark_recovered(self, request, queryset):
+        pending = queryset.exclude(status='recovered')
+        with transaction.atomic():
+            # Locks the rows it records, so the UPDATE changes exactly those
+            analytics.record_queryset('recovered', pending.select_for_update())
+            # update() skips auto_now; delta sync relies on updated_at moving
+            updated = pending.update(status='recovered', updated_at=timezone.now(), version=F('version') + 1)
+        log_activity('items_recovered', request, details=f"admin: {updated} items")
+        self.message_user(request, f"{updated} items marked as recovered", messages.SUCCESS)
+
+    def get_object(self, request, object_id, from_field=None):
+        obj = super().get_object(request, object_id, from_field)
+        if obj is not None and request.method == 'POST':
+            # changeform_view runs in a transaction: hold the row until the
+            # save commits, so ItemAdminForm.clean checks the version against
+            # the latest write and a stale form is redisplayed with its error
+            obj = Item.objects.select_for_update().filter(pk=obj.pk).first()
+        return obj
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        # Same versioned UPDATE as the API, so API clients see the edit; the
+        # row is locked since get_object, so the version still matches
+        fields = [name for name in form.changed_data if name != 'version']
+        if fields:
+            versioning.versioned_update(obj, fields, form.cleaned_data['version'])
+
+    # Deletes from the change form and the delete_selected action
+    def delete_model(self, request, obj):
+        delete_items([obj.id])
+
+    def delete_queryset(self, request, queryset):
+        ids = list(queryset.values_list('id', flat=True))
+        for start in range(0, len(ids), 500):
+            delete_items(ids[start:start + 500])
+
+    @admin.action(description='Move selected items to the archive')
+    def archive_items(self, request, queryset):
+        ids = list(queryset.values_list('id', flat=True))
+        archived = 0
+        for start in range(0, len(ids), 500):
+            archived += archive_batch(ids[start:start + 500])
+        self.message_user(request, f"{archived} items archived", messages.SUCCESS)
+
+
+@admin.register(Claim)
+class ClaimAdmin(LargeTableAdmin):
+    list_display = ('id', 'item', 'claimant_name', 'claimant_email', 'status', 'created_at')
+    list_select_related = ('item',)
+    list_filter = ('organization', 'status')
+    search_fields = ('=id', '=item__id')
+    raw_id_fields = ('item',)
+    readonly_fields = ('created_at',)
+    actions = ('approve_claims', 'reject_claims')
+
+    @admin.action(description='Approve selected pending claims')
+    def approve_claims(self, request, queryset):
+        updated = queryset.filter(status='pending').update(status='approved')
+        self.message_user(request, f"{updated} claims approved", messages.SUCCESS)
+
+    @admin.action(description='Reject selected pending claims')
+    def reject_claims(self, request, queryset):
+        updated = queryset.filter(status='pending').update(status='rejected')
+        self.message_user(request, f"{updated} claims rejected", messages.SUCCESS)
+
+
+@admin.register(Notification)
+class NotificationAdmin(LargeTableAdmin):
+    list_display = ('id', 'user', 'type', 'title', 'item', 'read', 'created_at')
+    list_select_related = ('user', 'item')
+    list_filter = ('read',)
+    search_fields = ('=id', '=user__email')
+    raw_id_fields = ('user', 'item')
+    readonly_fields = ('created_at',)
+    actions = ('mark_read',)
+
+    @admin.action(description='Mark selected notifications as read')
+    def mark_read(self, request, queryset):
+        updated = queryset.filter(read=False).update(read=True)
+        self.message_user(request, f"{updated} notifications marked as read", messages.SUCCESS)
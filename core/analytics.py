@@ -0,0 +1,215 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from .models import Item, ArchivedItem, ItemStatEvent, ItemStatRollup, StatRollupState
+from .suggest import normalize
+
+# Reporting rollups.
+# Views call record() in the same transaction that reports or recovers an
+# item, adding a row to 'item_stat_events' with the event, the item's
+# category, location and campus at that moment. Unlike the buffered audit
+# log, an event exists exactly when its item change committed. The
+# rollup_stats command folds new events into hourly and daily counts per
+# campus in 'item_stat_rollups' and remembers the last event id it
+# processed, so each run only reads rows added since the previous one.
+# /api/stats/overview reads the rollups and never groups over 'items'.
+#
+# NumPy is optional: without it the time-to-recovery distribution is
+# omitted from the overview.
+
+ANALYTICS_SETTINGS = {
+    'SETTLE_SECONDS': 60,    # skip events newer than this (lower ids may still be uncommitted)
+    'BATCH_SIZE': 5000,      # events folded per transaction
+    'CACHE_SECONDS': 300,    # overview responses are cached this long
+    'TOP_LOCATIONS': 10,
+    'MAX_DAYS': 365,
+    'MAX_HOURLY_DAYS': 7,
+}
+ANALYTICS_SETTINGS.update(getattr(settings, 'ANALYTICS', {}))
+
+SOURCE = 'item_stat_events'
+VALUE_LENGTH = 100
+
+# Hours; the last bucket is open-ended
+RECOVERY_BINS = [0, 1, 6, 24, 72, 168, 720]
+
+
+def truncate(moment, period):
+    moment = moment.astimezone(timezone.get_current_timezone())
+    if period == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def record(event, item):
+    # Add one event for item; call inside the transaction that changes it
+    ItemStatEvent.objects.create(
+        item_id=item.id, event=event, category=item.category or '',
+        location=item.location or '', organization_id=item.organization_id,
+    )
+
+
+def record_queryset(event, queryset):
+    # record() for every item in queryset, read in chunks; returns the count
+    batch = []
+    recorded = 0
+    rows = queryset.order_by().values_list('id', 'category', 'location', 'organization_id')
+    for item_id, category, location, organization_id in rows.iterator(chunk_size=ANALYTICS_SETTINGS['BATCH_SIZE']):
+        batch.append(ItemStatEvent(
+            item_id=item_id, event=event, category=category or '',
+            location=location or '', organization_id=organization_id,
+        ))
+        if len(batch) >= ANALYTICS_SETTINGS['BATCH_SIZE']:
+            ItemStatEvent.objects.bulk_create(batch)
+            recorded += len(batch)
+            batch = []
+    ItemStatEvent.objects.bulk_create(batch)
+    return recorded + len(batch)
+
+
+def rollup_keys(event, created_at, category, location, organization_id=None):
+    # (organization, period, dimension, bucket, event, value) rows one event adds to
+    keys = []
+    for period in ('hour', 'day'):
+        bucket = truncate(created_at, period)
+        keys.append((organization_id, period, 'all', bucket, event, ''))
+        keys.append((organization_id, period, 'category', bucket, event, (category or 'unknown')[:VALUE_LENGTH]))
+        if period == 'day':
+            keys.append((organization_id, period, 'location', bucket, event, normalize(location)[:VALUE_LENGTH] or 'unknown'))
+    return keys
+
+
+def _apply(increments):
+    for (organization_id, period, dimension, bucket, event, value), n in increments.items():
+        lookup = {
+            'organization_id': organization_id, 'period': period, 'dimension': dimension,
+            'bucket': bucket, 'event': event, 'value': value,
+        }
+        if ItemStatRollup.objects.filter(**lookup).update(count=F('count') + n):
+            continue
+        try:
+            with transaction.atomic():
+                ItemStatRollup.objects.create(count=n, **lookup)
+        except IntegrityError:
+            ItemStatRollup.objects.filter(**lookup).update(count=F('count') + n)
+
+
+def fold_batch(limit=None):
+    # Fold the next batch of settled events into the rollups; returns rows read
+    settled = timezone.now() - timedelta(seconds=ANALYTICS_SETTINGS['SETTLE_SECONDS'])
+    with transaction.atomic():
+        StatRollupState.objects.get_or_create(source=SOURCE)
+        state = StatRollupState.objects.select_for_update().get(source=SOURCE)
+        rows = list(
+            ItemStatEvent.objects.filter(id__gt=state.last_id, created_at__lt=settled)
+            .order_by('id')
+            .values_list('id', 'event', 'created_at', 'category', 'location', 'organization_id')
+            [:limit or ANALYTICS_SETTINGS['BATCH_SIZE']]
+        )
+        if not rows:
+            return 0
+        increments = {}
+        for _, event, created_at, category, location, organization_id in rows:
+            for key in rollup_keys(event, created_at, category, location, organization_id):
+                increments[key] = increments.get(key, 0) + 1
+        _apply(increments)
+        state.last_id = rows[-1][0]
+        state.save(update_fields=['last_id', 'updated_at'])
+    return len(rows)
+
+
+def reset():
+    # Drop all rollups and start again from the first event
+    with transaction.atomic():
+        ItemStatRollup.objects.all().delete()
+        StatRollupState.objects.filter(source=SOURCE).delete()
+
+
+def _counts(rows, key):
+    # [{key: ..., lost, found, recovered}] from (key, event, total) rows
+    merged = {}
+    for name, event, total in rows:
+        entry = merged.setdefault(name, {key: name, 'lost': 0, 'found': 0, 'recovered': 0})
+        entry[event] = total
+    return list(merged.values())
+
+
+def time_to_recovery(since, organization=None):
+    # Distribution of hours from report to recovery (items and archive), or None without NumPy
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    filters = Q(status='recovered', date_reported__gte=since)
+    if organization is not None:
+        filters &= Q(organization=organization)
+    pairs = list(Item.objects.filter(filters).values_list('date_reported', 'updated_at'))
+    pairs += list(ArchivedItem.objects.filter(filters).values_list('date_reported', 'updated_at'))
+    if not pairs:
+        return {'count': 0}
+    reported = np.array([p[0].timestamp() for p in pairs])
+    recovered = np.array([p[1].timestamp() for p in pairs])
+    hours = np.clip((recovered - reported) / 3600.0, 0, None)
+    p50, p75, p90 = np.percentile(hours, [50, 75, 90])
+    histogram, _ = np.histogram(hours, bins=RECOVERY_BINS + [max(hours.max(), RECOVERY_BINS[-1]) + 1])
+    return {
+        'count': int(hours.size),
+        'mean_hours': round(float(hours.mean()), 2),
+        'median_hours': round(float(p50), 2),
+        'p75_hours': round(float(p75), 2),
+        'p90_hours': round(float(p90), 2),
+        'histogram': [
+            {'from_hours': low, 'to_hours': high, 'count': int(n)}
+            for low, high, n in zip(RECOVERY_BINS, RECOVERY_BINS[1:] + [None], histogram)
+        ],
+    }
+
+
+def overview(days, period, organization=None):
+    # Counts for one campus, or all of them when organization is None
+    since = truncate(timezone.now() - timedelta(days=days), period)
+    campus = ItemStatRollup.objects.all()
+    if organization is not None:
+        campus = campus.filter(organization=organization)
+    rollups = campus.filter(period=period, bucket__gte=since)
+
+    series = _counts(
+        rollups.filter(dimension='all').values_list('bucket', 'event').annotate(total=Sum('count')).order_by('bucket'),
+        'bucket',
+    )
+    for entry in series:
+        entry['bucket'] = entry['bucket'].isoformat()
+    totals = {event: sum(entry[event] for entry in series) for event in ('lost', 'found', 'recovered')}
+
+    by_category = _counts(
+        rollups.filter(dimension='category').values_list('value', 'event').annotate(total=Sum('count')),
+        'category',
+    )
+    by_category.sort(key=lambda entry: -(entry['lost'] + entry['found']))
+
+    # Locations are only rolled up per day
+    day_rollups = campus.filter(period='day', bucket__gte=truncate(since, 'day'))
+    locations = _counts(
+        day_rollups.filter(dimension='location').values_list('value', 'event').annotate(total=Sum('count')),
+        'location',
+    )
+    locations.sort(key=lambda entry: -(entry['lost'] + entry['found']))
+    top_locations = locations[:ANALYTICS_SETTINGS['TOP_LOCATIONS']]
+
+    for entry in [totals] + by_category + top_locations:
+        reported = entry['lost'] + entry['found']
+        entry['recovery_rate'] = round(entry['recovered'] / reported, 4) if reported else None
+
+    return {
+        'period': period,
+        'since': since.isoformat(),
+        'totals': totals,
+        'series': series,
+        'by_category': by_category,
+        'top_locations': top_locations,
+        'time_to_recovery': time_to_recovery(since, organization),
+    }
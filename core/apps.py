@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+    default_auto_field = 'django.db.models.BigAutoField' # Matches the id columns in 0001_initial
+
+    def ready(self):
+        # Registers the Item signal handlers that keep the suggest index current
+        from . import suggest  # noqa: F401
@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .messaging import release_item_threads
+from .models import Item, Claim, Message, Notification, ArchivedItem
+from .sync import record_deletions
+
+# Archival of cold items.
+# Recovered items and stale lost/found reports are copied into
+# 'items_archive' (with their claims, messages and notifications as JSON)
+# and deleted from the hot 'items' table, which keeps api_items scans small.
+
+ITEM_FIELDS = [
+    'user_id', 'title', 'description', 'status', 'category', 'location', 'date', 'time',
+    'posted_by', 'contact', 'reward', 'additional_info', 'image_path', 'current_location',
+    'date_reported', 'updated_at', 'views', 'organization_id',
+]
+
+
+def archivable_items(recovered_days, stale_days, now=None):
+    # Recovered items untouched for recovered_days, open reports older than stale_days
+    now = now or timezone.now()
+    return Item.objects.filter(
+        Q(status='recovered', updated_at__lt=now - timedelta(days=recovered_days))
+        | Q(status__in=['lost', 'found'], date_reported__lt=now - timedelta(days=stale_days))
+    )
+
+
+def _group_by_item(rows):
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row['item_id'], []).append(row)
+    return grouped
+
+
+def archive_batch(item_ids):
+    # Move one batch of items (and their dependents) into the archive table.
+    # Returns the number of items archived.
+    with transaction.atomic():
+        items = list(Item.objects.select_for_update().filter(id__in=item_ids).values('id', *ITEM_FIELDS))
+        if not items:
+            return 0
+        ids = [item['id'] for item in items]
+
+        claims = _group_by_item(Claim.objects.filter(item_id__in=ids).values())
+        messages = _group_by_item(Message.objects.filter(item_id__in=ids).values())
+        notifications = _group_by_item(Notification.objects.filter(item_id__in=ids).values())
+
+        ArchivedItem.objects.bulk_create([
+            ArchivedItem(
+                original_id=item['id'],
+                related={
+                    'claims': claims.get(item['id'], []),
+                    'messages': messages.get(item['id'], []),
+                    'notifications': notifications.get(item['id'], []),
+                },
+                **{field: item[field] for field in ITEM_FIELDS},
+            )
+            for item in items
+        ])
+
+        # Unread messages in archived threads no longer count towards the inbox total
+        release_item_threads(ids)
+
+        # Delta-sync clients drop archived items from their caches
+        record_deletions([(item['id'], item['user_id'], item['organization_id']) for item in items], reason='archived')
+
+        Notification.objects.filter(item_id__in=ids).delete()
+        # Cascades to claims, conversations and messages
+        Item.objects.filter(id__in=ids).delete()
+    return len(ids)
+
+
+def delete_items(item_ids):
+    # Hard-delete items the way every delete path must: tombstones for
+    # delta-sync clients and the unread counts of their threads released.
+    # Returns the number of items deleted.
+    with transaction.atomic():
+        items = list(Item.objects.select_for_update().filter(id__in=item_ids).values_list('id', 'user_id', 'organization_id'))
+        if not items:
+            return 0
+        ids = [item[0] for item in items]
+        record_deletions(items)
+        release_item_threads(ids)
+        Item.objects.filter(id__in=ids).delete()
+    return len(ids)
+
@@ -0,0 +1,169 @@
+import atexit
+import ipaddress
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+
+from .models import Item, ActivityLog
+
+# Buffered ActivityLog writer.
+# Views call log_activity(); the row is appended to an in-memory buffer and
+# written with bulk_create by a background thread when the buffer reaches
+# FLUSH_SIZE or every FLUSH_INTERVAL seconds. The buffer is bounded by
+# MAX_BUFFER: once full, new entries are dropped and counted rather than
+# blocking the request.
+
+logger = logging.getLogger(__name__)
+
+AUDIT_SETTINGS = {
+    'ENABLED': True,
+    'FLUSH_SIZE': 100,      # rows that trigger an early flush
+    'FLUSH_INTERVAL': 2.0,  # seconds between background flushes
+    'MAX_BUFFER': 10000,    # rows held in memory before dropping
+    'SYNC': False,          # write every entry inline (tests/debugging)
+}
+AUDIT_SETTINGS.update(getattr(settings, 'AUDIT_LOG', {}))
+
+
+# Proxies whose X-Forwarded-For entries are believed (addresses or networks)
+TRUSTED_PROXIES = [ipaddress.ip_network(proxy, strict=False) for proxy in getattr(settings, 'TRUSTED_PROXIES', [])]
+
+
+def trusted_proxy(address):
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+
+def client_ip(request):
+    # The socket address, or when that is a trusted proxy, the nearest
+    # X-Forwarded-For hop it did not add itself. Clients can put anything in
+    # the header, so hops left of the first untrusted one are never used.
+    address = request.META.get('REMOTE_ADDR')
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if not forwarded or not trusted_proxy(address):
+        return address
+    for hop in reversed([hop.strip() for hop in forwarded.split(',')]):
+        if not trusted_proxy(hop):
+            return hop[:50]
+    return address
+
+
+class AuditBuffer:
+    def __init__(self, flush_size, flush_interval, max_buffer):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._rows = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def add(self, row):
+        with self._lock:
+            if len(self._rows) >= self.max_buffer:
+                self.dropped += 1
+                return False
+            self._rows.append(row)
+            size = len(self._rows)
+        if size >= self.flush_size:
+            self._wakeup.set()
+        return True
+
+    def flush(self):
+        # Write everything buffered so far; safe to call from any thread
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+            try:
+                with transaction.atomic():
+                    ActivityLog.objects.bulk_create(rows, batch_size=500)
+            except DatabaseError:
+                # Usually an item deleted before the flush; drop the dangling FKs and retry once
+                item_ids = {row.item_id for row in rows if row.item_id}
+                existing = set(Item.objects.filter(id__in=item_ids).values_list('id', flat=True))
+                for row in rows:
+                    if row.item_id not in existing:
+                        row.item_id = None
+                try:
+                    with transaction.atomic():
+                        ActivityLog.objects.bulk_create(rows, batch_size=500)
+                except DatabaseError:
+                    logger.exception("Dropping %d activity log rows", len(rows))
+                    self.failed += len(rows)
+                    return 0
+            self.written += len(rows)
+            self.flushes += 1
+            return len(rows)
+
+    def stats(self):
+        with self._lock:
+            buffered = len(self._rows)
+        return {
+            'buffered': buffered,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'flushes': self.flushes,
+        }
+
+    def start(self):
+        # Start the background writer (once per process, again after a fork)
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Activity log flush failed")
+            finally:
+                close_old_connections()
+
+
+buffer = AuditBuffer(
+    AUDIT_SETTINGS['FLUSH_SIZE'],
+    AUDIT_SETTINGS['FLUSH_INTERVAL'],
+    AUDIT_SETTINGS['MAX_BUFFER'],
+)
+atexit.register(buffer.flush)
+
+
+def log_activity(action, request=None, user=None, item=None, details=None):
+    # Record an audit entry; never raises into the calling view
+    if not AUDIT_SETTINGS['ENABLED']:
+        return
+    if user is None and request is not None and getattr(request, 'user', None) is not None:
+        if request.user.is_authenticated:
+            user = request.user
+    row = ActivityLog(
+        user_id=user.id if user is not None else None,
+        item_id=item.id if item is not None else None,
+        action=action,
+        details=details,
+        ip_address=client_ip(request) if request is not None else None,
+    )
+    buffer.add(row)
+    if AUDIT_SETTINGS['SYNC']:
+        buffer.flush()
+    else:
+        buffer.start()
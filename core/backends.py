@@ -0,0 +1,29 @@
+from django.contrib.auth.backends import ModelBackend
+
+from .models import User
+
+# Authentication backend that looks users up by email.
+# api_login receives an email address; 'users.email' carries a unique index,
+# so this is a single indexed lookup followed by one password check.
+
+
+class EmailBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, email=None, **kwargs):
+        if password is None:
+            return None
+        try:
+            if email is not None:
+                user = User._default_manager.get(email=email)
+            elif username is not None:
+                # Admin login form still posts 'username'
+                user = User._default_manager.get_by_natural_key(username)
+            else:
+                return None
+        except User.DoesNotExist:
+            # Run the hasher anyway so unknown emails take as long as wrong passwords
+            User().set_password(password)
+            return None
+        # check_password() re-hashes with the preferred hasher when needed
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,82 @@
+from datetime import datetime
+
+# Columnar encoding for the items API (?format=columnar).
+# Instead of a list of objects that repeat every key, the response holds one
+# array per field. Columns are encoded as:
+#   [v0, v1, ...]                      plain values
+#   {'dict': [...], 'codes': [...]}    dictionary-encoded: value = dict[code]
+#   {'delta': [...]}                   integers: value[i] = sum(delta[0..i])
+# Timestamps (DELTA_FIELDS) are epoch milliseconds, delta-encoded.
+# Candidate string columns are dictionary-encoded only when they repeat
+# enough to make it smaller. Rows need not share keys (archived rows add
+# 'archived'); a row without a field gets null in that column.
+
+DICT_FIELDS = ('status', 'category', 'location', 'posted_by', 'image', 'date', 'time', 'reward', 'contact')
+DELTA_FIELDS = ('date_reported',)
+
+
+def _epoch_ms(value):
+    return int(datetime.fromisoformat(value).timestamp() * 1000)
+
+
+def _delta(values):
+    encoded = []
+    previous = 0
+    for value in values:
+        encoded.append(value - previous)
+        previous = value
+    return encoded
+
+
+def _dictionary(values):
+    codes = []
+    index = {}
+    for value in values:
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(index)
+        codes.append(code)
+    return list(index), codes
+
+
+def encode(rows):
+    # rows: list of dicts (api_items row format)
+    if not rows:
+        return {'length': 0, 'fields': [], 'columns': {}}
+    # Every key of every row, in first-seen order
+    fields = list(dict.fromkeys(field for row in rows for field in row))
+    columns = {}
+    for field in fields:
+        values = [row.get(field) for row in rows]
+        if field in DELTA_FIELDS and None not in values:
+            columns[field] = {'delta': _delta([_epoch_ms(v) for v in values])}
+        elif field in DICT_FIELDS:
+            dictionary, codes = _dictionary(values)
+            if len(dictionary) * 2 <= len(values):
+                columns[field] = {'dict': dictionary, 'codes': codes}
+            else:
+                columns[field] = values
+        else:
+            columns[field] = values
+    return {'length': len(rows), 'fields': fields, 'columns': columns}
+
+
+def decode(payload):
+    # Inverse of encode(); timestamps come back as epoch milliseconds
+    decoded = {}
+    for field in payload['fields']:
+        column = payload['columns'][field]
+        if isinstance(column, list):
+            decoded[field] = column
+        elif 'dict' in column:
+            dictionary = column['dict']
+            decoded[field] = [dictionary[code] for code in column['codes']]
+        else:
+            total = 0
+            values = []
+            for delta in column['delta']:
+                total += delta
+                values.append(total)
+            decoded[field] = values
+    fields = payload['fields']
+    return [dict(zip(fields, row)) for row in zip(*(decoded[f] for f in fields))]
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_string
+
+# Response compression for API/text responses above a size threshold.
+# Brotli is used when the client accepts it and the 'brotli' package is
+# installed, otherwise gzip. Small responses are sent as-is: compressing
+# them costs more CPU than it saves on the wire. Like Django's
+# GZipMiddleware, gzip output carries up to GZIP_MAX_RANDOM_BYTES of random
+# filename header so its length does not leak secrets (BREACH).
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_SETTINGS = {
+    'MIN_SIZE': 1024,   # bytes
+    'BROTLI_QUALITY': 5,
+    'GZIP_MAX_RANDOM_BYTES': 100,
+    'CONTENT_TYPES': ('application/json', 'text/', 'application/javascript'),
+}
+COMPRESSION_SETTINGS.update(getattr(settings, 'RESPONSE_COMPRESSION', {}))
+
+_brotli_re = _lazy_re_compile(r'\bbr\b')
+_gzip_re = _lazy_re_compile(r'\bgzip\b')
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(COMPRESSION_SETTINGS['CONTENT_TYPES']):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < COMPRESSION_SETTINGS['MIN_SIZE']:
+            return response
+
+        accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and _brotli_re.search(accept):
+            compressed = brotli.compress(response.content, quality=COMPRESSION_SETTINGS['BROTLI_QUALITY'])
+            encoding = 'br'
+        elif _gzip_re.search(accept):
+            compressed = compress_string(response.content, max_random_bytes=COMPRESSION_SETTINGS['GZIP_MAX_RANDOM_BYTES'])
+            encoding = 'gzip'
+        else:
+            return response
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The body differs per encoding, so a strong ETag no longer applies
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,119 @@
+from django.db.models import Count, Q
+
+from .models import Item, Claim, Notification
+
+# Composite data for the profile and my-items pages.
+# Every section is a single query (the user row is loaded by the view), so a
+# full dashboard costs at most five round trips however many items, claims
+# or notifications the user has. ?include= picks a subset of SECTIONS.
+
+SECTIONS = ('user', 'stats', 'items', 'claims', 'notifications')
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def parse_include(value):
+    # Comma-separated section names -> tuple; raises ValueError on unknown names
+    if not value:
+        return SECTIONS
+    requested = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in requested if name not in SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown include: {', '.join(unknown)}")
+    return tuple(name for name in SECTIONS if name in requested)
+
+
+def section_limit(value):
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_LIMIT
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def item_stats(user):
+    # One aggregate query instead of a COUNT(*) per status
+    return Item.objects.filter(user=user).aggregate(
+        total=Count('id'),
+        lost=Count('id', filter=Q(status='lost')),
+        found=Count('id', filter=Q(status='found')),
+        recovered=Count('id', filter=Q(status='recovered')),
+    )
+
+
+def user_to_dict(user):
+    return {
+        'id': user.id,
+        'name': f"{user.first_name} {user.last_name}".strip() or user.username,
+        'email': user.email,
+        'phone': user.phone,
+        'location': user.location,
+        'bio': user.bio,
+        'join_date': user.date_joined.isoformat(),
+        'unread_messages': user.unread_messages,
+        'version': user.version,
+    }
+
+
+def recent_items(user, limit):
+    return list(Item.objects.filter(user=user).order_by('-id')[:limit])
+
+
+def pending_claims(user, limit):
+    # Pending claims on any of the user's items, with the item joined in
+    return list(
+        Claim.objects.filter(item__user=user, status='pending')
+        .select_related('item')
+        .order_by('-id')[:limit]
+    )
+
+
+def unread_notifications(user, limit):
+    # Returns (notifications, has_more); fetches one extra row instead of counting
+    rows = list(Notification.objects.filter(user=user, read=False).order_by('-id')[:limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def claim_to_dict(claim):
+    return {
+        'id': claim.id,
+        'item_id': claim.item_id,
+        'item_title': claim.item.title,
+        'claimant_name': claim.claimant_name,
+        'claimant_email': claim.claimant_email,
+        'claimant_phone': claim.claimant_phone,
+        'description': claim.description,
+        'status': claim.status,
+        'created_at': claim.created_at.isoformat(),
+    }
+
+
+def notification_to_dict(notification):
+    return {
+        'id': notification.id,
+        'item_id': notification.item_id,
+        'type': notification.type,
+        'title': notification.title,
+        'message': notification.message,
+        'read': notification.read,
+        'created_at': notification.created_at.isoformat(),
+    }
+
+
+def build(user, include=SECTIONS, limit=DEFAULT_LIMIT):
+    # Dict with one key per included section; 'items' holds Item instances
+    # for the view to serialise with its own item_to_dict()
+    data = {}
+    if 'user' in include:
+        data['user'] = user_to_dict(user)
+    if 'stats' in include:
+        data['stats'] = item_stats(user)
+    if 'items' in include:
+        data['items'] = recent_items(user, limit)
+    if 'claims' in include:
+        data['pending_claims'] = [claim_to_dict(claim) for claim in pending_claims(user, limit)]
+    if 'notifications' in include:
+        notifications, has_more = unread_notifications(user, limit)
+        data['notifications'] = [notification_to_dict(n) for n in notifications]
+        data['more_notifications'] = has_more
+    return data
@@ -0,0 +1,193 @@
+import hashlib
+import random
+import re
+import zlib
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Item, ItemFingerprint, ItemFingerprintBand, User
+
+# Near-duplicate detection for new reports.
+# title + description + location is split into character shingles and
+# summarised by a MinHash signature (NUM_PERM values). The signature is cut
+# into BANDS bands; each band is hashed to a bucket stored in
+# 'item_fingerprint_bands'. A new report only compares itself against items
+# sharing at least one bucket, so a lookup is a handful of indexed reads
+# instead of a scan over every item. Buckets depend on the text alone; the
+# status to compare with is read from the items at lookup time, so a status
+# change needs no re-indexing. Texts with fewer than MIN_SHINGLES shingles
+# ("phone", empty descriptions) are not bucketed: they would all collide in
+# a few huge buckets and match each other.
+# check_report -> create -> index_item runs under reporter_lock(), so two
+# concurrent re-posts by one reporter cannot both miss each other and be
+# stored twice.
+
+DEDUP_SETTINGS = {
+    'ENABLED': True,
+    'SHINGLE_SIZE': 4,
+    'MIN_SHINGLES': 10,        # shorter texts are neither bucketed nor checked
+    'NUM_PERM': 64,
+    'BANDS': 16,               # NUM_PERM must be divisible by BANDS
+    'THRESHOLD': 0.7,          # estimated Jaccard similarity that flags a duplicate
+    'MERGE_THRESHOLD': 0.95,   # ... that merges into the earlier report
+    'MERGE_WINDOW_HOURS': 24,  # only merge re-posts by the same reporter this recent
+    'LOCK_TIMEOUT': 10,        # seconds to wait for a reporter's lock (MySQL)
+}
+DEDUP_SETTINGS.update(getattr(settings, 'DEDUP', {}))
+
+DedupResult = namedtuple('DedupResult', 'signature buckets duplicate_of score merge_into')
+
+_MERSENNE = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(20260210)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE))
+    for _ in range(DEDUP_SETTINGS['NUM_PERM'])
+]
+
+
+def shingles(text):
+    words = re.findall(r'[a-z0-9]+', (text or '').lower())
+    normalized = ' '.join(words)
+    size = DEDUP_SETTINGS['SHINGLE_SIZE']
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def minhash(text):
+    hashed = [zlib.crc32(s.encode('utf-8')) for s in shingles(text)]
+    if not hashed:
+        return [_MAX_HASH] * DEDUP_SETTINGS['NUM_PERM']
+    return [
+        min(((a * h + b) % _MERSENNE) & _MAX_HASH for h in hashed)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def indexable(text):
+    # Enough distinct shingles for a signature to say something about the text
+    return len(shingles(text)) >= DEDUP_SETTINGS['MIN_SHINGLES']
+
+
+def band_buckets(signature):
+    # One signed 64-bit bucket per band
+    rows = len(signature) // DEDUP_SETTINGS['BANDS']
+    buckets = []
+    for band in range(DEDUP_SETTINGS['BANDS']):
+        chunk = signature[band * rows:(band + 1) * rows]
+        key = f"{band}:{','.join(map(str, chunk))}".encode('utf-8')
+        digest = hashlib.blake2b(key, digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, 'big', signed=True))
+    return buckets
+
+
+def similarity(sig_a, sig_b):
+    # Estimated Jaccard similarity of the two shingle sets
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def item_text(title, description, location):
+    return f"{title} {description} {location}"
+
+
+def find_duplicate(signature, buckets, status=None, organization=None):
+    # Best (item_id, score) above THRESHOLD among the campus's items with this
+    # status sharing a bucket, or (None, 0)
+    if not buckets:
+        return None, 0.0
+    bands = ItemFingerprintBand.objects.filter(bucket__in=buckets)
+    if status is not None:
+        # Lost reports are only compared with lost reports (and found with found)
+        bands = bands.filter(item__status=status)
+    if organization is not None:
+        bands = bands.filter(item__organization=organization)
+    candidate_ids = set(bands.values_list('item_id', flat=True))
+    best_id, best_score = None, 0.0
+    if not candidate_ids:
+        return best_id, best_score
+    for item_id, other in ItemFingerprint.objects.filter(item_id__in=candidate_ids).values_list('item_id', 'signature'):
+        score = similarity(signature, other)
+        if score > best_score:
+            best_id, best_score = item_id, score
+    if best_score < DEDUP_SETTINGS['THRESHOLD']:
+        return None, 0.0
+    return best_id, best_score
+
+
+class ReporterLockTimeout(Exception):
+    pass
+
+
+@contextmanager
+def reporter_lock(user=None, contact=None):
+    # Transaction for one report's check_report -> create -> index_item.
+    # Locks the reporter's user row and, as anonymous reporters only have a
+    # contact, a named lock on the contact: MySQL's GET_LOCK belongs to the
+    # session, so it is taken before the transaction and released after the
+    # commit; PostgreSQL's advisory lock ends with the transaction. SQLite
+    # serialises writers anyway.
+    contact = (contact or '').strip().lower()
+    digest = hashlib.blake2b(contact.encode('utf-8'), digest_size=8).digest()
+    name = f"findit-report:{digest.hex()}"
+    named = bool(contact) and connection.vendor == 'mysql'
+    if named:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT GET_LOCK(%s, %s)", [name, DEDUP_SETTINGS['LOCK_TIMEOUT']])
+            if cursor.fetchone()[0] != 1:
+                raise ReporterLockTimeout(contact)
+    try:
+        with transaction.atomic():
+            if contact and connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_xact_lock(%s)", [int.from_bytes(digest, 'big', signed=True)])
+            if user is not None:
+                list(User.objects.select_for_update().filter(id=user.id).values_list('id', flat=True))
+            yield
+    finally:
+        if named:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", [name])
+
+
+def check_report(status, title, description, location, user=None, contact=None, organization=None):
+    # Run before creating a report. merge_into is set to an existing Item when
+    # the new report is a re-post by the same reporter that should not be stored.
+    # Only reports of the same campus (organization) are compared.
+    text = item_text(title, description, location)
+    signature = minhash(text)
+    if not indexable(text):
+        return DedupResult(signature, [], None, 0.0, None)
+    buckets = band_buckets(signature)
+    duplicate_id, score = find_duplicate(signature, buckets, status, organization)
+    merge_into = None
+    if duplicate_id and score >= DEDUP_SETTINGS['MERGE_THRESHOLD']:
+        window = timezone.now() - timedelta(hours=DEDUP_SETTINGS['MERGE_WINDOW_HOURS'])
+        existing = Item.objects.filter(id=duplicate_id, status=status, date_reported__gte=window).first()
+        if existing is not None and (
+            (user is not None and existing.user_id == user.id) or (contact and existing.contact == contact)
+        ):
+            merge_into = existing
+    return DedupResult(signature, buckets, duplicate_id, score, merge_into)
+
+
+def index_item(item, signature=None, buckets=None, duplicate_id=None, score=None):
+    # Store the item's signature and LSH buckets
+    text = item_text(item.title, item.description, item.location)
+    if signature is None:
+        signature = minhash(text)
+    if buckets is None:
+        buckets = band_buckets(signature) if indexable(text) else []
+    ItemFingerprint.objects.update_or_create(
+        item=item,
+        defaults={'signature': signature, 'duplicate_of_id': duplicate_id, 'similarity': score or None},
+    )
+    ItemFingerprintBand.objects.filter(item=item).delete()
+    ItemFingerprintBand.objects.bulk_create([
+        ItemFingerprintBand(item=item, bucket=bucket) for bucket in buckets
+    ])
@@ -0,0 +1,12 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+# PBKDF2 hasher with a configurable work factor (settings.PASSWORD_PBKDF2_ITERATIONS).
+# It keeps the 'pbkdf2_sha256' algorithm name, so existing hashes stay valid.
+# Django re-hashes a password on the next successful login whenever the
+# stored iteration count differs from the configured one, so the setting
+# may only raise the count: anything below Django's default is ignored.
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = max(getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', None) or 0, PBKDF2PasswordHasher.iterations)
@@ -0,0 +1,224 @@
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .media import upload_path
+from .models import Item
+
+# Perceptual hashing of uploaded item photos.
+# dhash() reduces a photo to a 64-bit difference hash (9x8 grayscale,
+# one bit per horizontal gradient), so re-encoded, resized or slightly
+# recoloured copies of a picture end up a few bits apart. Hashes are
+# stored on Item.image_hash (computed by the 'hash_item_image' task) and
+# searched by Hamming distance through an in-memory multi-index hash, which
+# each process rebuilds in a background thread every REFRESH_SECONDS (or at
+# startup, see core/startup.py); requests never wait for a build.
+#
+# Pillow is optional: without it hashing is skipped and similar-image
+# search simply returns nothing.
+
+logger = logging.getLogger(__name__)
+
+IMAGE_INDEX_SETTINGS = {
+    'MAX_DISTANCE': 10,      # default/maximum Hamming distance for searches
+    'REFRESH_SECONDS': 60,   # rebuild the per-process index after this long
+}
+IMAGE_INDEX_SETTINGS.update(getattr(settings, 'IMAGE_INDEX', {}))
+
+HASH_BITS = 64
+_MASK = (1 << HASH_BITS) - 1
+
+
+def dhash(path):
+    # 64-bit difference hash as an unsigned int, or None when Pillow is
+    # missing or the upload is not a readable image (uploads accept any file)
+    try:
+        from PIL import Image, UnidentifiedImageError
+    except ImportError:
+        return None
+    try:
+        with Image.open(path) as image:
+            pixels = list(image.convert('L').resize((9, 8), Image.Resampling.LANCZOS).getdata())
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        return None
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+def to_signed(value):
+    # BigIntegerField is signed; store the 64 bits as two's complement
+    return value - (1 << HASH_BITS) if value >= (1 << (HASH_BITS - 1)) else value
+
+
+def to_unsigned(value):
+    return value & _MASK
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class MultiIndexHash:
+    # Multi-index hashing over Hamming distance. Each 64-bit hash is split
+    # into CHUNKS 16-bit chunks with one dict per chunk position. By the
+    # pigeonhole principle, two hashes within distance r agree to within
+    # r // CHUNKS bits on at least one chunk, so a search only probes chunk
+    # values near the query's chunks and verifies those candidates exactly.
+    CHUNKS = 4
+    CHUNK_BITS = HASH_BITS // CHUNKS
+    CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+    def __init__(self):
+        self.tables = [{} for _ in range(self.CHUNKS)]
+        self.hashes = {}  # item_id -> hash
+        self.size = 0
+
+    def _chunks(self, value):
+        return [(value >> (i * self.CHUNK_BITS)) & self.CHUNK_MASK for i in range(self.CHUNKS)]
+
+    def add(self, value, item_id):
+        if item_id in self.hashes:
+            self.remove(item_id)
+        self.hashes[item_id] = value
+        for table, chunk in zip(self.tables, self._chunks(value)):
+            table.setdefault(chunk, []).append(item_id)
+        self.size += 1
+
+    def remove(self, item_id):
+        value = self.hashes.pop(item_id, None)
+        if value is None:
+            return
+        for table, chunk in zip(self.tables, self._chunks(value)):
+            bucket = table.get(chunk)
+            if bucket and item_id in bucket:
+                bucket.remove(item_id)
+        self.size -= 1
+
+    def _probes(self, chunk, radius):
+        # Every CHUNK_BITS-bit value within 'radius' bit flips of chunk
+        probes = [chunk]
+        frontier = [(chunk, -1)]
+        for _ in range(radius):
+            next_frontier = []
+            for value, last_bit in frontier:
+                for bit in range(last_bit + 1, self.CHUNK_BITS):
+                    flipped = value ^ (1 << bit)
+                    probes.append(flipped)
+                    next_frontier.append((flipped, bit))
+            frontier = next_frontier
+        return probes
+
+    def search(self, value, max_distance):
+        # [(distance, item_id)] for every stored hash within max_distance
+        radius = max_distance // self.CHUNKS
+        seen = set()
+        found = []
+        for table, chunk in zip(self.tables, self._chunks(value)):
+            for probe in self._probes(chunk, radius):
+                for item_id in table.get(probe, ()):
+                    if item_id in seen:
+                        continue
+                    seen.add(item_id)
+                    distance = hamming(value, self.hashes[item_id])
+                    if distance <= max_distance:
+                        found.append((distance, item_id))
+        return found
+
+
+class ImageIndex:
+    # Per-process index of all item image hashes, rebuilt off the request path
+    # every REFRESH_SECONDS. The lock guards the live index: searches, adds and the swap.
+    def __init__(self):
+        self._index = MultiIndexHash()
+        self._built_at = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pending = None  # hashes added while a rebuild runs
+
+    def current(self):
+        # The live index, possibly still empty; starts a rebuild when stale
+        if self._built_at is None or time.monotonic() - self._built_at > IMAGE_INDEX_SETTINGS['REFRESH_SECONDS']:
+            self.start_refresh()
+        return self._index
+
+    def refresh(self):
+        # Build without holding the lock, then swap in with late adds replayed
+        with self._lock:
+            self._pending = []
+        try:
+            built = self.build()
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            for value, item_id in self._pending:
+                built.add(value, item_id)
+            self._pending = None
+            self._index = built
+            self._built_at = time.monotonic()
+
+    def start_refresh(self):
+        # Rebuild in a background thread (one per process, again after a fork)
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run_refresh, name='image-index', daemon=True)
+            self._thread.start()
+
+    def _run_refresh(self):
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Image index rebuild failed")
+        finally:
+            close_old_connections()
+
+    def build(self):
+        built = MultiIndexHash()
+        rows = Item.objects.filter(image_hash__isnull=False).values_list('id', 'image_hash')
+        for item_id, value in rows.iterator(chunk_size=5000):
+            built.add(to_unsigned(value), item_id)
+        return built
+
+    def add(self, item_id, value):
+        # Make a freshly hashed item visible in this process before the next rebuild
+        with self._lock:
+            self._index.add(to_unsigned(value), item_id)
+            if self._pending is not None:
+                self._pending.append((to_unsigned(value), item_id))
+
+    def similar(self, value, max_distance, exclude=None):
+        self.current()
+        # Under the lock: a concurrent add() could move an item between buckets mid-search
+        with self._lock:
+            matches = self._index.search(to_unsigned(value), max_distance)
+        return sorted((d, item_id) for d, item_id in matches if item_id != exclude)
+
+
+index = ImageIndex()
+
+
+def hash_item_image(item):
+    # Compute and store item.image_hash; returns the signed hash or None
+    if not item.image_path:
+        return None
+    path = upload_path(item.image_path)
+    if not os.path.exists(path):
+        return None
+    value = dhash(path)
+    if value is None:
+        return None
+    signed = to_signed(value)
+    Item.objects.filter(id=item.id).update(image_hash=signed)
+    index.add(item.id, signed)
+    return signed
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from core.archive import archivable_items, archive_batch
+from core.sync import prune_tombstones
+from core.tasks import purge_done
+
+# Periodic job (cron/systemd timer):
+#   python manage.py archive_items --recovered-days 30 --stale-days 365
+
+
+class Command(BaseCommand):
+    help = ('Move recovered and stale items (with claims, messages, notifications) into items_archive, '
+            'then prune old sync tombstones and finished tasks')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recovered-days', type=int, default=30,
+                            help='Archive recovered items not updated for this many days')
+        parser.add_argument('--stale-days', type=int, default=365,
+                            help='Archive lost/found reports older than this many days')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Only count matching items')
+
+    def handle(self, *args, **options):
+        queryset = archivable_items(options['recovered_days'], options['stale_days'])
+
+        if options['dry_run']:
+            self.stdout.write(f"{queryset.count()} items would be archived")
+            return
+
+        archived = 0
+        last_id = 0
+        # Walk the candidates in primary-key batches; each batch is its own transaction
+        while True:
+            ids = list(
+                queryset.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            archived += archive_batch(ids)
+            last_id = ids[-1]
+
+        pruned = prune_tombstones()
+        purged = purge_done()
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} items, pruned {pruned} sync tombstones and {purged} finished tasks"
+        ))
@@ -0,0 +1,55 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.imagehash import MultiIndexHash, hamming
+
+# Multi-index hash vs linear scan for similar-image lookups over synthetic hashes:
+#   python manage.py bench_image_index --size 100000 --queries 200
+# Synthetic hashes are clustered (near-copies of a set of base images) so
+# the distribution resembles real photo collections more than uniform noise.
+
+
+class Command(BaseCommand):
+    help = 'Benchmark Hamming-distance search at a given index size'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=100000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--distances', default='2,4,6,8,10')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        size = options['size']
+        bases = [rng.getrandbits(64) for _ in range(max(1, size // 20))]
+
+        def near(value, flips):
+            for bit in rng.sample(range(64), flips):
+                value ^= 1 << bit
+            return value
+
+        hashes = [near(rng.choice(bases), rng.randint(0, 6)) for _ in range(size)]
+        queries = [near(rng.choice(bases), rng.randint(0, 3)) for _ in range(options['queries'])]
+
+        start = time.perf_counter()
+        index = MultiIndexHash()
+        for item_id, value in enumerate(hashes):
+            index.add(value, item_id)
+        self.stdout.write(f"built index of {size} hashes in {time.perf_counter() - start:.2f}s")
+
+        for max_distance in [int(d) for d in options['distances'].split(',')]:
+            start = time.perf_counter()
+            index_hits = sum(len(index.search(q, max_distance)) for q in queries)
+            index_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+            start = time.perf_counter()
+            scan_hits = sum(1 for q in queries for value in hashes if hamming(q, value) <= max_distance)
+            scan_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+            assert index_hits == scan_hits
+            self.stdout.write(
+                f"d<={max_distance:>2}: index {index_ms:8.3f} ms/query, linear {scan_ms:8.3f} ms/query "
+                f"({scan_ms / index_ms:5.1f}x), {index_hits / len(queries):.1f} matches/query"
+            )
@@ -0,0 +1,90 @@
+import gzip
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand
+
+from core import columnar
+from core.compression import brotli
+from core.views import get_category_emoji
+
+# Payload size and parse time of the api_items row format vs ?format=columnar,
+# on synthetic items shaped like real reports:
+#   python manage.py bench_items_format --sizes 10000,100000
+# "parse" is json.loads (plus decode back to rows for columnar), the work a
+# client does before it can render the list.
+
+CATEGORIES = ['electronics', 'accessories', 'bags', 'documents', 'jewelry', 'clothing', 'other']
+LOCATIONS = ['Main Library', 'Student Center', 'Gym', 'Cafeteria', 'Parking Lot B', 'Science Building',
+             'Dorm A', 'Dorm B', 'Bus Stop', 'Auditorium', 'Lecture Hall 1', 'Lecture Hall 2']
+WORDS = ['black', 'blue', 'leather', 'wallet', 'phone', 'keys', 'bottle', 'jacket', 'laptop', 'charger',
+         'card', 'id', 'bag', 'small', 'red', 'silver', 'watch', 'ring', 'near', 'left', 'found', 'lost']
+
+
+def synthetic_rows(count, rng):
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    posters = [f"user{n}" for n in range(max(1, count // 20))]
+    rows = []
+    for n in range(count):
+        category = rng.choice(CATEGORIES)
+        poster = rng.choice(posters)
+        rows.append({
+            'id': count - n,
+            'title': ' '.join(rng.choices(WORDS, k=3)).title(),
+            'description': ' '.join(rng.choices(WORDS, k=14)),
+            'status': rng.choice(['lost', 'found', 'recovered']),
+            'category': category,
+            'location': rng.choice(LOCATIONS),
+            'date': (start + timedelta(days=n // 50)).date().isoformat(),
+            'time': f"{rng.randint(0, 23):02d}:{rng.choice(['00', '15', '30', '45'])}",
+            'posted_by': poster,
+            'contact': f"{poster}@example.edu",
+            'reward': rng.choice(['', '', '', '₹500', '₹1000']),
+            'image_path': None,
+            'image': get_category_emoji(category),
+            'views': rng.randint(0, 300),
+            'date_reported': (start + timedelta(seconds=n * 137)).isoformat(),
+        })
+    rows.reverse()
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Compare api_items row vs columnar payload size and parse time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000')
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        for size in [int(s) for s in options['sizes'].split(',')]:
+            rows = synthetic_rows(size, rng)
+            self.stdout.write(f"--- {size} items ---")
+
+            start = time.perf_counter()
+            columns = columnar.encode(rows)
+            encode_ms = (time.perf_counter() - start) * 1000
+
+            payloads = {
+                'rows': json.dumps({'success': True, 'items': rows}, ensure_ascii=False).encode('utf-8'),
+                'columnar': json.dumps({'success': True, 'format': 'columnar', 'items': columns},
+                                       ensure_ascii=False).encode('utf-8'),
+            }
+            for label, body in payloads.items():
+                gz = len(gzip.compress(body, 6))
+                br = f"{len(brotli.compress(body, quality=5)) / 1024:9.0f} KiB br" if brotli else "(brotli not installed)"
+
+                start = time.perf_counter()
+                data = json.loads(body)
+                if label == 'columnar':
+                    columnar.decode(data['items'])
+                parse_ms = (time.perf_counter() - start) * 1000
+
+                self.stdout.write(
+                    f"{label:>9}: {len(body) / 1024:9.0f} KiB raw {gz / 1024:9.0f} KiB gzip {br}  "
+                    f"parse {parse_ms:7.1f} ms"
+                )
+            self.stdout.write(f"  columnar encode: {encode_ms:.1f} ms")
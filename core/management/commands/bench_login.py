@@ -0,0 +1,87 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import authenticate, login
+from django.contrib.auth.hashers import get_hasher
+from django.contrib.sessions.backends.db import SessionStore as DBSessionStore
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from core.models import User
+
+# Logins per second on one core, old path vs current path:
+#   before: lookup by email, then authenticate() by username (second lookup),
+#           stock PBKDF2 hasher, database-backed session
+#   after:  EmailBackend single lookup, PASSWORD_HASHERS[0], SESSION_ENGINE
+#   python manage.py bench_login --rounds 20
+# Both sides must hash with the same iteration count, or the result measures
+# the work factor rather than the login path; the command refuses otherwise.
+
+BENCH_EMAIL = 'bench-login@findit.local'
+BENCH_PASSWORD = 'bench-login-password'
+
+LEGACY_SETTINGS = {
+    'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+    'PASSWORD_HASHERS': ['django.contrib.auth.hashers.PBKDF2PasswordHasher'],
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure api_login throughput (logins/second/core) before and after the fast login path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=10)
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        session_store = import_module(settings.SESSION_ENGINE).SessionStore
+
+        def before():
+            request = factory.post('/api/login')
+            request.session = DBSessionStore()
+            user_obj = User.objects.get(email=BENCH_EMAIL)
+            user = authenticate(request, username=user_obj.username, password=BENCH_PASSWORD)
+            login(request, user)
+            request.session.save()
+
+        def after():
+            request = factory.post('/api/login')
+            request.session = session_store()
+            user = authenticate(request, email=BENCH_EMAIL, password=BENCH_PASSWORD)
+            login(request, user)
+            request.session.save()
+
+        with override_settings(**LEGACY_SETTINGS):
+            before_iterations = get_hasher().iterations
+        after_iterations = get_hasher().iterations
+        if before_iterations != after_iterations:
+            self.stderr.write(
+                f"Iteration counts differ ({before_iterations} vs {after_iterations}); "
+                "unset PASSWORD_PBKDF2_ITERATIONS to compare the login paths"
+            )
+            return
+        self.stdout.write(f"PBKDF2 iterations: {after_iterations} (both)")
+
+        User.objects.filter(email=BENCH_EMAIL).delete()
+        try:
+            with override_settings(**LEGACY_SETTINGS):
+                User.objects.create_user(username=BENCH_EMAIL, email=BENCH_EMAIL, password=BENCH_PASSWORD)
+                before_rate = self.measure('before', before, options['rounds'])
+            # The first 'after' login re-hashes the password with the configured hasher
+            after()
+            after_rate = self.measure('after', after, options['rounds'])
+            self.stdout.write(self.style.SUCCESS(f"speedup: {after_rate / before_rate:.2f}x"))
+        finally:
+            User.objects.filter(email=BENCH_EMAIL).delete()
+
+    def measure(self, label, login_once, rounds):
+        login_once()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            login_once()
+        elapsed = time.perf_counter() - start
+        rate = rounds / elapsed
+        self.stdout.write(f"{label:>6}: {rate:8.2f} logins/s/core ({elapsed / rounds * 1000:.1f} ms each)")
+        return rate
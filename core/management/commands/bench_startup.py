@@ -0,0 +1,167 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Cold start and per-worker memory of the WSGI app, lazy vs preloaded:
+#   python manage.py bench_startup --workers 4 --imports 15
+# Each run starts a fresh interpreter that imports findit_django.wsgi (the
+# "master"), then forks --workers children that each serve --path once, the
+# way gunicorn --preload does. Memory comes from /proc/self/smaps_rollup:
+# "private" pages belong to one worker only, PSS splits shared pages between
+# the processes using them. --imports adds a -X importtime breakdown by
+# top-level package; django.setup() itself is counted under findit_django.
+
+DEFAULT_PROFILES = ['findit_django.settings', 'findit_django.settings_production']
+DEFAULT_PATHS = ['/', '/browse.html']
+
+CHILD = r'''
+import json, os, sys, time
+from io import BytesIO
+
+start = time.perf_counter()
+config = json.loads(sys.argv[1])
+
+
+def emit(**record):
+    os.write(1, (json.dumps(record) + "\n").encode())
+
+
+def memory():
+    # kB; falls back to peak RSS where smaps_rollup is unavailable
+    try:
+        with open("/proc/self/smaps_rollup") as handle:
+            fields = dict(line.split()[:2] for line in handle if line.split()[0].endswith(":"))
+        return {
+            "rss": int(fields["Rss:"]),
+            "pss": int(fields["Pss:"]),
+            "private": int(fields["Private_Clean:"]) + int(fields["Private_Dirty:"]),
+        }
+    except OSError:
+        import resource
+        return {"rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+
+
+from core import startup
+
+startup.STARTUP_SETTINGS["PRELOAD"] = config["preload"]
+from findit_django.wsgi import application
+
+emit(role="master", ready_ms=(time.perf_counter() - start) * 1000, **memory())
+
+workers = []
+for _ in range(config["workers"]):
+    pid = os.fork()
+    if pid == 0:
+        statuses = []
+        first = time.perf_counter()
+        for path in config["paths"]:
+            path, _, query = path.partition("?")
+            environ = {
+                "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": query,
+                "SERVER_NAME": "localhost", "SERVER_PORT": "80", "HTTP_HOST": "localhost",
+                "wsgi.input": BytesIO(), "wsgi.errors": sys.stderr, "wsgi.url_scheme": "http",
+            }
+            response = application(environ, lambda status, headers, exc_info=None: statuses.append(status[:3]))
+            for _chunk in response:
+                pass
+            if hasattr(response, "close"):
+                response.close()
+        emit(role="worker", first_ms=(time.perf_counter() - first) * 1000, statuses=statuses, **memory())
+        os._exit(0)
+    workers.append(pid)
+for pid in workers:
+    os.waitpid(pid, 0)
+'''
+
+
+def _env(profile):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=profile)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(settings.BASE_DIR), env.get('PYTHONPATH')]))
+    return env
+
+
+def import_breakdown(profile):
+    # {top-level package: self import time in ms} for importing the WSGI app
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import findit_django.wsgi'],
+        env=_env(profile), capture_output=True, text=True, check=True,
+    )
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(own) / 1000
+    return packages
+
+
+class Command(BaseCommand):
+    help = 'Measure WSGI cold start time and per-worker memory with and without preload'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', action='append', dest='profiles',
+                            help=f"settings module (repeatable, default: {', '.join(DEFAULT_PROFILES)})")
+        parser.add_argument('--path', action='append', dest='paths',
+                            help=f"URL each worker serves (repeatable, default: {', '.join(DEFAULT_PATHS)})")
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--runs', type=int, default=3)
+        parser.add_argument('--imports', type=int, default=0, help='show the N slowest packages to import')
+
+    def handle(self, *args, **options):
+        if not hasattr(os, 'fork'):
+            self.stderr.write('bench_startup needs os.fork()')
+            return
+        for profile in options['profiles'] or DEFAULT_PROFILES:
+            self.stdout.write(f"--- {profile} ---")
+            if options['imports']:
+                packages = import_breakdown(profile)
+                self.stdout.write(f"  imports: {sum(packages.values()):7.1f} ms total")
+                for package, ms in sorted(packages.items(), key=lambda entry: -entry[1])[:options['imports']]:
+                    self.stdout.write(f"    {package:<24} {ms:7.1f} ms")
+            for preload in (False, True):
+                self.report('preload' if preload else 'lazy', [
+                    self.run_once(profile, preload, options) for _ in range(options['runs'])
+                ])
+
+    def run_once(self, profile, preload, options):
+        config = {'preload': preload, 'workers': options['workers'], 'paths': options['paths'] or DEFAULT_PATHS}
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, '-c', CHILD, json.dumps(config)], env=_env(profile), stdout=subprocess.PIPE, text=True,
+        )
+        master, workers = None, []
+        for line in process.stdout:
+            record = json.loads(line)
+            if record['role'] == 'master':
+                # Interpreter start included: what a scale-out event waits for
+                record['cold_ms'] = (time.perf_counter() - started) * 1000
+                master = record
+            else:
+                workers.append(record)
+        if process.wait() != 0 or master is None:
+            raise RuntimeError(f"benchmark process failed for {profile}")
+        return master, workers
+
+    def report(self, label, runs):
+        cold = statistics.median(master['cold_ms'] for master, _ in runs)
+        master_rss = statistics.median(master['rss'] for master, _ in runs) / 1024
+        workers = [worker for _, run_workers in runs for worker in run_workers]
+        first = statistics.median(worker['first_ms'] for worker in workers)
+        line = f"{label:>9}: cold start {cold:7.1f} ms  master RSS {master_rss:6.1f} MiB  first request {first:6.1f} ms"
+        if 'private' in workers[0]:
+            private = statistics.median(worker['private'] for worker in workers) / 1024
+            pss = statistics.median(worker['pss'] for worker in workers) / 1024
+            line += f"  worker private {private:5.1f} MiB  PSS {pss:5.1f} MiB"
+        else:
+            line += f"  worker peak RSS {statistics.median(w['rss'] for w in workers) / 1024:6.1f} MiB"
+        self.stdout.write(line)
+        statuses = sorted({status for worker in workers for status in worker['statuses']})
+        if statuses != ['200']:
+            self.stdout.write(self.style.WARNING(f"           response statuses: {', '.join(statuses)}"))
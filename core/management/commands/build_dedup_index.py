@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from core.dedup import index_item
+from core.models import Item
+
+# Backfill MinHash signatures/LSH buckets for items reported before
+# deduplication existed (new reports are indexed on create):
+#   python manage.py build_dedup_index
+
+
+class Command(BaseCommand):
+    help = 'Compute MinHash fingerprints for items that do not have one yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Recompute every fingerprint')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        items = Item.objects.only('id', 'title', 'description', 'location').order_by('id')
+        if not options['all']:
+            items = items.filter(fingerprint__isnull=True)
+
+        indexed = 0
+        last_id = 0
+        while True:
+            batch = list(items.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            for item in batch:
+                index_item(item)
+            indexed += len(batch)
+            last_id = batch[-1].id
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} items"))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.imagehash import hash_item_image
+from core.models import Item
+
+# Backfill perceptual hashes for items uploaded before hashing existed
+# (new uploads are hashed by the run_tasks worker):
+#   python manage.py hash_item_images
+
+
+class Command(BaseCommand):
+    help = 'Compute image_hash for items with a photo but no hash'
+
+    def handle(self, *args, **options):
+        items = Item.objects.filter(image_hash__isnull=True).exclude(image_path__isnull=True).exclude(image_path='')
+        hashed = skipped = 0
+        for item in items.only('id', 'image_path').iterator():
+            if hash_item_image(item) is None:
+                skipped += 1
+            else:
+                hashed += 1
+        self.stdout.write(self.style.SUCCESS(f"Hashed {hashed} images ({skipped} missing or unreadable)"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from core.analytics import fold_batch, reset
+
+# Periodic job (cron/systemd timer, every few minutes):
+#   python manage.py rollup_stats
+# Reads only events added since the previous run.
+
+
+class Command(BaseCommand):
+    help = 'Fold new report/recovery events into the analytics rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Drop the rollups and recompute them from every recorded event')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            reset()
+
+        folded = 0
+        while True:
+            read = fold_batch(options['batch_size'])
+            if not read:
+                break
+            folded += read
+
+        self.stdout.write(self.style.SUCCESS(f"Folded {folded} events into the rollups"))
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.tasks import QUEUE_SETTINGS, claim_batch, run_tasks, worker_id
+
+# Background worker for the task queue in core/tasks.py:
+#   python manage.py run_tasks            # poll forever
+#   python manage.py run_tasks --once     # drain due tasks and exit
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks (notifications, email and SMS delivery)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when no due tasks remain')
+        parser.add_argument('--batch-size', type=int, default=QUEUE_SETTINGS['BATCH_SIZE'])
+        parser.add_argument('--sleep', type=float, default=1.0, help='Seconds to wait when the queue is empty')
+
+    def handle(self, *args, **options):
+        worker = worker_id()
+        total_ok = total_failed = 0
+        while True:
+            batch = claim_batch(options['batch_size'], worker)
+            if not batch:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+            ok, failed = run_tasks(batch)
+            total_ok += ok
+            total_failed += failed
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Ran {ok + failed} tasks ({failed} failed)")
+
+        self.stdout.write(self.style.SUCCESS(f"Tasks done: {total_ok} succeeded, {total_failed} failed"))
@@ -0,0 +1,165 @@
+import mimetypes
+import os
+import re
+import secrets
+from datetime import datetime
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+from django.utils.text import get_valid_filename
+
+# Uploaded item photos.
+# save_upload() streams an upload to disk chunk by chunk under a collision-free
+# name. serve() answers GET/HEAD for /uploads/<name> with ETag/Last-Modified
+# validation and single byte ranges, and either hands the file to the front
+# proxy (ACCEL: 'x-accel-redirect' for nginx, 'x-sendfile' for Apache/lighttpd)
+# or streams it with FileResponse so the server can use sendfile(). File
+# contents are never read into worker memory as a whole.
+#
+# The extension comes from the uploader, so only raster image types are
+# served inline. Anything else (HTML, SVG, ...) is sent as an octet-stream
+# attachment with nosniff, so it cannot run as a page on this origin.
+
+MEDIA_SETTINGS = {
+    'ROOT': os.path.join(settings.BASE_DIR, 'findit_django', 'static', 'uploads'),
+    'ACCEL': None,                          # None, 'x-accel-redirect' or 'x-sendfile'
+    'ACCEL_PREFIX': '/protected-uploads/',  # internal nginx location for X-Accel-Redirect
+    'MAX_AGE': 30 * 86400,                  # uploads are never rewritten in place
+    'CHUNK_SIZE': 64 * 1024,
+}
+MEDIA_SETTINGS.update(getattr(settings, 'MEDIA', {}))
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+INLINE_TYPES = {'image/png', 'image/jpeg', 'image/gif', 'image/webp'}
+
+
+def upload_path(filename):
+    return os.path.join(MEDIA_SETTINGS['ROOT'], filename)
+
+
+def save_upload(uploaded):
+    # Write an UploadedFile to the uploads directory; returns the stored name
+    os.makedirs(MEDIA_SETTINGS['ROOT'], exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    name = get_valid_filename(os.path.basename(uploaded.name)) or 'upload'
+    while True:
+        # Random part keeps same-second uploads of the same file name apart
+        filename = f"{timestamp}_{secrets.token_hex(4)}_{name}"
+        try:
+            destination = open(upload_path(filename), 'xb')
+        except FileExistsError:
+            continue
+        with destination:
+            for chunk in uploaded.chunks():
+                destination.write(chunk)
+        return filename
+
+
+def parse_range(header, size):
+    # (start, end) inclusive for a single 'bytes=' range, None to send the whole
+    # file, or False when the range cannot be satisfied
+    match = _RANGE.match(header.strip())
+    if match is None:
+        return None  # malformed or multiple ranges: ignore the header
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(path, start, length, chunk_size):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve(request, filename):
+    try:
+        path = safe_join(MEDIA_SETTINGS['ROOT'], filename)
+    except SuspiciousFileOperation:
+        raise Http404('File not found')
+    try:
+        stat = os.stat(path)
+    except OSError:
+        raise Http404('File not found')
+    if not os.path.isfile(path):
+        raise Http404('File not found')
+
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    last_modified = int(stat.st_mtime)
+    content_type = mimetypes.guess_type(path)[0]
+    inline = content_type in INLINE_TYPES
+    if not inline:
+        content_type = 'application/octet-stream'
+
+    def finish(response):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = f"public, max-age={MEDIA_SETTINGS['MAX_AGE']}"
+        response['Accept-Ranges'] = 'bytes'
+        response['X-Content-Type-Options'] = 'nosniff'
+        if not inline:
+            response['Content-Disposition'] = content_disposition_header(True, os.path.basename(path))
+        return response
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        return finish(conditional)
+
+    accel = MEDIA_SETTINGS['ACCEL']
+    if accel:
+        # The proxy sends the bytes (and handles Range itself)
+        response = HttpResponse(content_type=content_type)
+        if accel == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = MEDIA_SETTINGS['ACCEL_PREFIX'] + quote(filename)
+        else:
+            response['X-Sendfile'] = path
+        return finish(response)
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header and request.headers.get('If-Range', etag) == etag:
+        byte_range = parse_range(range_header, size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f"bytes */{size}"
+        return finish(response)
+
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response['Content-Length'] = str(size)
+        return finish(response)
+
+    if byte_range is None:
+        # FileResponse uses wsgi.file_wrapper (sendfile) when the server offers it
+        return finish(FileResponse(open(path, 'rb'), content_type=content_type))
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        _read_range(path, start, length, MEDIA_SETTINGS['CHUNK_SIZE']), status=206, content_type=content_type
+    )
+    response['Content-Range'] = f"bytes {start}-{end}/{size}"
+    response['Content-Length'] = str(length)
+    return finish(response)
@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import F, Q, Sum, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import User, Conversation, ConversationParticipant, Message
+from .pagination import DEFAULT_PAGE_SIZE
+
+# Messaging helpers used by the inbox API views.
+# Threads are grouped by (item, participants). Unread counters live on
+# ConversationParticipant (per thread) and User.unread_messages (total) and
+# are updated with F() expressions on write, so reading an inbox never has
+# to COUNT(*) over the messages table.
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def encode_cursor(timestamp, pk):
+    # "<microseconds since epoch>_<id>": digits only, so it survives a query string unencoded
+    if timestamp is None:
+        return f"_{pk}"
+    return f"{(timestamp - EPOCH) // timedelta(microseconds=1)}_{pk}"
+
+
+def decode_cursor(cursor):
+    # Returns (timestamp, id), None without a cursor; ValueError for a malformed one
+    if not cursor:
+        return None
+    raw_ts, separator, raw_id = cursor.partition('_')
+    if not separator or not raw_id.isdigit() or (raw_ts and not raw_ts.isdigit()):
+        raise ValueError('Invalid cursor')
+    timestamp = EPOCH + timedelta(microseconds=int(raw_ts)) if raw_ts else None
+    return timestamp, int(raw_id)
+
+
+def conversation_for(conversation_id, user):
+    # The conversation if user takes part in it, else None
+    return Conversation.objects.filter(
+        Q(user_low=user) | Q(user_high=user), id=conversation_id
+    ).first()
+
+
+def get_or_create_conversation(item, user_a, user_b):
+    low, high = sorted([user_a, user_b], key=lambda u: u.id)
+    conversation, created = Conversation.objects.get_or_create(item=item, user_low=low, user_high=high)
+    if created:
+        ConversationParticipant.objects.bulk_create([
+            ConversationParticipant(conversation=conversation, user=low, peer=high),
+            ConversationParticipant(conversation=conversation, user=high, peer=low),
+        ])
+    return conversation
+
+
+def send_message(item, sender, receiver, body, subject=None):
+    # Store a message and bump the receiver's unread counters in one transaction
+    with transaction.atomic():
+        conversation = get_or_create_conversation(item, sender, receiver)
+        message = Message.objects.create(
+            item=item,
+            conversation=conversation,
+            sender=sender,
+            receiver=receiver,
+            sender_name=f"{sender.first_name} {sender.last_name}".strip() or sender.username,
+            sender_email=sender.email,
+            receiver_email=receiver.email,
+            subject=subject,
+            message=body,
+        )
+        Conversation.objects.filter(id=conversation.id).update(
+            last_message=message, last_message_at=message.created_at
+        )
+        ConversationParticipant.objects.filter(conversation=conversation, user=sender).update(
+            last_message_at=message.created_at
+        )
+        ConversationParticipant.objects.filter(conversation=conversation, user=receiver).update(
+            last_message_at=message.created_at, unread_count=F('unread_count') + 1
+        )
+        User.objects.filter(id=receiver.id).update(unread_messages=F('unread_messages') + 1)
+    return message
+
+
+def mark_conversation_read(conversation, user):
+    # Reset the thread's unread counter and subtract it from the user's total
+    with transaction.atomic():
+        participant = (
+            ConversationParticipant.objects.select_for_update()
+            .filter(conversation=conversation, user=user)
+            .first()
+        )
+        if participant is None:
+            return 0
+        unread = participant.unread_count
+        if unread:
+            Message.objects.filter(conversation=conversation, receiver=user, read=False).update(read=True)
+            User.objects.filter(id=user.id).update(
+                unread_messages=Greatest(F('unread_messages') - unread, Value(0))
+            )
+        participant.unread_count = 0
+        participant.last_read_at = timezone.now()
+        participant.save(update_fields=['unread_count', 'last_read_at'])
+    return unread
+
+
+def release_item_threads(item_ids):
+    # Subtract the unread counts of these items' threads from their users'
+    # totals. Call in the transaction that deletes or archives the items: the
+    # delete cascades to the participant rows and the counts would be lost.
+    unread = (
+        ConversationParticipant.objects.filter(conversation__item_id__in=item_ids, unread_count__gt=0)
+        .values('user_id')
+        .annotate(total=Sum('unread_count'))
+    )
+    for row in unread:
+        User.objects.filter(id=row['user_id']).update(
+            unread_messages=Greatest(F('unread_messages') - row['total'], Value(0))
+        )
+
+
+def inbox_page(user, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    # One query: the user's threads ordered by latest activity, newest first
+    entries = (
+        ConversationParticipant.objects.filter(user=user, last_message_at__isnull=False)
+        .select_related('peer', 'conversation__item', 'conversation__last_message')
+        .order_by('-last_message_at', '-id')
+    )
+    position = decode_cursor(cursor)
+    if position and position[0]:
+        timestamp, pk = position
+        entries = entries.filter(
+            Q(last_message_at__lt=timestamp) | Q(last_message_at=timestamp, id__lt=pk)
+        )
+    entries = list(entries[:limit + 1])
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        last = entries[-1]
+        next_cursor = encode_cursor(last.last_message_at, last.id)
+    return entries, next_cursor
+
+
+def message_to_dict(message):
+    return {
+        'id': message.id,
+        'conversation_id': message.conversation_id,
+        'item_id': message.item_id,
+        'sender_id': message.sender_id,
+        'receiver_id': message.receiver_id,
+        'sender_name': message.sender_name,
+        'sender_email': message.sender_email,
+        'receiver_email': message.receiver_email,
+        'subject': message.subject,
+        'message': message.message,
+        'read': message.read,
+        'created_at': message.created_at.isoformat(),
+    }
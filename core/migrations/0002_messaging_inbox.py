@@ -0,0 +1,158 @@
+# Generated by Django 6.0.2 on 2026-10-19 17:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def thread_existing_messages(apps, schema_editor):
+    # Link messages stored before threads existed to their users (by email)
+    # and group them into conversations with the same unread counters that
+    # core/messaging.py maintains for new messages. Messages whose sender or
+    # receiver matches no user keep a NULL conversation.
+    User = apps.get_model('core', 'User')
+    Message = apps.get_model('core', 'Message')
+    Conversation = apps.get_model('core', 'Conversation')
+    ConversationParticipant = apps.get_model('core', 'ConversationParticipant')
+
+    users = {}
+    for user_id, email in User.objects.order_by('-id').values_list('id', 'email'):
+        if email:
+            users[email.strip().lower()] = user_id  # lowest id wins for a shared address
+    threads = {}  # (item_id, low, high) -> {'conversation', 'last', 'unread': {user_id: n}}
+    unread_totals = {}
+    for message in Message.objects.filter(conversation__isnull=True).order_by('id').iterator(chunk_size=2000):
+        sender_id = users.get((message.sender_email or '').strip().lower())
+        receiver_id = users.get((message.receiver_email or '').strip().lower())
+        message.sender_id = sender_id
+        message.receiver_id = receiver_id
+        if sender_id and receiver_id and sender_id != receiver_id:
+            low, high = sorted([sender_id, receiver_id])
+            thread = threads.get((message.item_id, low, high))
+            if thread is None:
+                conversation, _ = Conversation.objects.get_or_create(item_id=message.item_id, user_low_id=low, user_high_id=high)
+                thread = threads[(message.item_id, low, high)] = {'conversation': conversation, 'unread': {}}
+            thread['last'] = message
+            message.conversation = thread['conversation']
+            if not message.read:
+                thread['unread'][receiver_id] = thread['unread'].get(receiver_id, 0) + 1
+                unread_totals[receiver_id] = unread_totals.get(receiver_id, 0) + 1
+        message.save(update_fields=['sender', 'receiver', 'conversation'])
+
+    for (_, low, high), thread in threads.items():
+        conversation, last = thread['conversation'], thread['last']
+        conversation.last_message = last
+        conversation.last_message_at = last.created_at
+        conversation.save(update_fields=['last_message', 'last_message_at'])
+        for user_id, peer_id in ((low, high), (high, low)):
+            ConversationParticipant.objects.update_or_create(
+                conversation=conversation, user_id=user_id,
+                defaults={
+                    'peer_id': peer_id,
+                    'last_message_at': last.created_at,
+                    'unread_count': thread['unread'].get(user_id, 0),
+                },
+            )
+    for user_id, total in unread_totals.items():
+        User.objects.filter(id=user_id).update(unread_messages=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationParticipant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unread_count', models.IntegerField(default=0)),
+                ('last_message_at', models.DateTimeField(null=True)),
+                ('last_read_at', models.DateTimeField(null=True)),
+            ],
+            options={
+                'db_table': 'conversation_participants',
+            },
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='receiver',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='received_messages', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='sender',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sent_messages', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='unread_messages',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_message_at', models.DateTimeField(null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversations', to='core.item')),
+                ('last_message', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.message')),
+                ('user_high', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user_low', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'conversations',
+            },
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='conversation',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='core.conversation'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['receiver', '-id'], name='message_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['sender', '-id'], name='message_outbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', '-id'], name='message_thread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['receiver_email'], name='message_receiver_email_idx'),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='conversation',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participants', to='core.conversation'),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='peer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversation_entries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(fields=('item', 'user_low', 'user_high'), name='conversation_item_pair_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='conversationparticipant',
+            index=models.Index(fields=['user', '-last_message_at', '-id'], name='participant_inbox_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='conversationparticipant',
+            constraint=models.UniqueConstraint(fields=('conversation', 'user'), name='participant_conversation_user_uniq'),
+        ),
+        migrations.RunPython(thread_existing_messages, migrations.RunPython.noop),
+    ]
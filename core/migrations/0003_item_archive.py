@@ -0,0 +1,61 @@
+# Generated by Django 6.0.2 on 2026-10-19 17:17
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_messaging_inbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('status', models.CharField(choices=[('lost', 'Lost'), ('found', 'Found'), ('recovered', 'Recovered')], max_length=50)),
+                ('category', models.CharField(max_length=50)),
+                ('location', models.CharField(max_length=255)),
+                ('date', models.CharField(max_length=50)),
+                ('time', models.CharField(blank=True, max_length=50, null=True)),
+                ('posted_by', models.CharField(max_length=255)),
+                ('contact', models.CharField(max_length=255)),
+                ('reward', models.CharField(blank=True, max_length=255, null=True)),
+                ('additional_info', models.TextField(blank=True, null=True)),
+                ('image_path', models.CharField(blank=True, max_length=255, null=True)),
+                ('current_location', models.CharField(blank=True, max_length=255, null=True)),
+                ('date_reported', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('views', models.IntegerField(default=0)),
+                ('related', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'items_archive',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['status', 'date_reported'], name='item_status_reported_idx'),
+        ),
+        migrations.AddField(
+            model_name='archiveditem',
+            name='user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_items', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='archiveditem',
+            index=models.Index(fields=['status', '-date_reported'], name='archive_status_reported_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archiveditem',
+            index=models.Index(fields=['user', '-date_reported'], name='archive_user_reported_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-19 17:21
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    # The unique index cannot be built over duplicates, and which account
+    # keeps an address is a support decision, so stop here and list them.
+    # Compared lowercased: MySQL's default collation treats case as equal.
+    User = apps.get_model('core', 'User')
+    duplicates = (
+        User.objects.annotate(address=Lower('email')).values('address')
+        .annotate(accounts=Count('id')).filter(accounts__gt=1).order_by('address')
+    )
+    if duplicates:
+        listed = ', '.join(f"{row['address'] or '<blank>'} ({row['accounts']} users)" for row in duplicates[:20])
+        raise RuntimeError(
+            f"Cannot make users.email unique: {len(duplicates)} addresses are shared by several "
+            f"accounts: {listed}. Give each account its own email address, then migrate again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_activity_log_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='user',
+            name='email',
+            field=models.EmailField(max_length=254, unique=True, verbose_name='email address'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.2 on 2026-10-19 17:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_unique_user_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemFingerprint',
+            fields=[
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='core.item')),
+                ('signature', models.JSONField()),
+                ('similarity', models.FloatField(blank=True, null=True)),
+                ('duplicate_of', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.item')),
+            ],
+            options={
+                'db_table': 'item_fingerprints',
+            },
+        ),
+        migrations.CreateModel(
+            name='ItemFingerprintBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(db_index=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprint_bands', to='core.item')),
+            ],
+            options={
+                'db_table': 'item_fingerprint_bands',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 17:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_item_dedup_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='image_hash',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_item_delta_sync'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'read', '-id'], name='notification_unread_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 6.0.2 on 2026-10-19 19:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_notification_unread_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('status', models.CharField(blank=True, choices=[('lost', 'Lost'), ('found', 'Found')], max_length=20, null=True)),
+                ('category', models.CharField(blank=True, max_length=50, null=True)),
+                ('keywords', models.CharField(blank=True, max_length=255, null=True)),
+                ('location', models.CharField(blank=True, max_length=255, null=True)),
+                ('active', models.BooleanField(default=True)),
+                ('last_matched_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'saved_searches',
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(db_index=True, max_length=120)),
+                ('search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='core.savedsearch')),
+            ],
+            options={
+                'db_table': 'saved_search_terms',
+            },
+        ),
+    ]
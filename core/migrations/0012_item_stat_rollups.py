@@ -0,0 +1,41 @@
+# Generated by Django 6.0.2 on 2026-10-19 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_saved_searches'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatRollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'item_stat_rollup_state',
+            },
+        ),
+        migrations.CreateModel(
+            name='ItemStatRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=10)),
+                ('bucket', models.DateTimeField()),
+                ('event', models.CharField(max_length=20)),
+                ('dimension', models.CharField(max_length=20)),
+                ('value', models.CharField(blank=True, default='', max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'item_stat_rollups',
+                'constraints': [models.UniqueConstraint(fields=('period', 'dimension', 'bucket', 'event', 'value'), name='item_stat_rollup_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-19 19:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_item_stat_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['date_reported'], name='item_reported_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['title'], name='item_title_idx'),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 6.0.2 on 2026-10-19 20:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def assign_default_organization(apps, schema_editor):
+    # Existing data becomes the 'default' campus
+    Organization = apps.get_model('core', 'Organization')
+    org, _ = Organization.objects.get_or_create(slug='default', defaults={'name': 'Default campus'})
+    for name in ('User', 'Category', 'Item', 'Claim', 'ArchivedItem'):
+        apps.get_model('core', name).objects.filter(organization__isnull=True).update(organization=org)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_item_user_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Organization',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('slug', models.SlugField(unique=True)),
+                ('domain', models.CharField(blank=True, max_length=255, null=True, unique=True)),
+                ('db_alias', models.CharField(blank=True, max_length=50, null=True)),
+                ('active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'organizations',
+            },
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='name',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AddField(
+            model_name='archiveditem',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='archived_items', to='core.organization'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='categories', to='core.organization'),
+        ),
+        migrations.AddField(
+            model_name='claim',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='claims', to='core.organization'),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='items', to='core.organization'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='users', to='core.organization'),
+        ),
+        migrations.AddIndex(
+            model_name='archiveditem',
+            index=models.Index(fields=['organization', '-date_reported'], name='archive_org_reported_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='claim',
+            index=models.Index(fields=['organization', 'status', '-id'], name='claim_org_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['organization', '-date_reported'], name='item_org_reported_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['organization', 'status', '-date_reported'], name='item_org_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['organization', 'updated_at', 'id'], name='item_org_updated_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='category',
+            constraint=models.UniqueConstraint(fields=('organization', 'name'), name='category_org_name_uniq'),
+        ),
+        migrations.RunPython(assign_default_organization, migrations.RunPython.noop),
+    ]
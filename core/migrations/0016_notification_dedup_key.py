@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_organizations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='dedup_key',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 6.0.2 on 2026-10-19 23:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+EVENTS = {
+    'report_lost': 'lost',
+    'report_found': 'found',
+    'item_recovered': 'recovered',
+}
+
+
+def copy_logged_events(apps, schema_editor):
+    # Seed the event table from the audit log the rollups used to read, and
+    # drop those rollups; the next rollup_stats run rebuilds them per campus
+    ActivityLog = apps.get_model('core', 'ActivityLog')
+    ItemStatEvent = apps.get_model('core', 'ItemStatEvent')
+    rows = (
+        ActivityLog.objects.filter(action__in=list(EVENTS)).order_by('id')
+        .values_list('action', 'created_at', 'item_id', 'item__category', 'item__location', 'item__organization_id')
+    )
+    batch = []
+    for action, created_at, item_id, category, location, organization_id in rows.iterator(chunk_size=5000):
+        batch.append(ItemStatEvent(
+            item_id=item_id or 0, event=EVENTS[action], category=category or '',
+            location=location or '', organization_id=organization_id, created_at=created_at,
+        ))
+        if len(batch) >= 5000:
+            ItemStatEvent.objects.bulk_create(batch)
+            batch = []
+    ItemStatEvent.objects.bulk_create(batch)
+    apps.get_model('core', 'ItemStatRollup').objects.all().delete()
+    apps.get_model('core', 'StatRollupState').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_notification_dedup_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemStatEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_id', models.BigIntegerField()),
+                ('event', models.CharField(choices=[('lost', 'Lost'), ('found', 'Found'), ('recovered', 'Recovered')], max_length=20)),
+                ('category', models.CharField(blank=True, default='', max_length=50)),
+                ('location', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'item_stat_events',
+            },
+        ),
+        migrations.RemoveConstraint(
+            model_name='itemstatrollup',
+            name='item_stat_rollup_key',
+        ),
+        migrations.AddField(
+            model_name='itemstatrollup',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='stat_rollups', to='core.organization'),
+        ),
+        migrations.AddConstraint(
+            model_name='itemstatrollup',
+            constraint=models.UniqueConstraint(fields=('organization', 'period', 'dimension', 'bucket', 'event', 'value'), name='item_stat_rollup_key'),
+        ),
+        migrations.AddField(
+            model_name='itemstatevent',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='stat_events', to='core.organization'),
+        ),
+        migrations.RunPython(copy_logged_events, migrations.RunPython.noop),
+    ]
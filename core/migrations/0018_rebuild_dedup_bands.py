@@ -0,0 +1,70 @@
+# Generated by Django 6.0.2 on 2026-10-19 23:40
+
+import hashlib
+import re
+
+from django.db import migrations
+
+# Frozen copies of core/dedup.py's helpers and settings as of this
+# migration, so later changes there cannot alter what it does
+SHINGLE_SIZE = 4
+MIN_SHINGLES = 10
+BANDS = 16
+
+
+def shingles(text):
+    words = re.findall(r'[a-z0-9]+', (text or '').lower())
+    normalized = ' '.join(words)
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+def indexable(text):
+    return len(shingles(text)) >= MIN_SHINGLES
+
+
+def band_buckets(signature):
+    rows = len(signature) // BANDS
+    buckets = []
+    for band in range(BANDS):
+        chunk = signature[band * rows:(band + 1) * rows]
+        key = f"{band}:{','.join(map(str, chunk))}".encode('utf-8')
+        digest = hashlib.blake2b(key, digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, 'big', signed=True))
+    return buckets
+
+
+def item_text(title, description, location):
+    return f"{title} {description} {location}"
+
+
+def rebuild_bands(apps, schema_editor):
+    # Bucket keys no longer include the status, and short texts are no longer
+    # bucketed: recompute every item's bands from its stored signature
+    ItemFingerprint = apps.get_model('core', 'ItemFingerprint')
+    ItemFingerprintBand = apps.get_model('core', 'ItemFingerprintBand')
+    ItemFingerprintBand.objects.all().delete()
+    rows = ItemFingerprint.objects.order_by('item_id').values_list(
+        'item_id', 'signature', 'item__title', 'item__description', 'item__location'
+    )
+    batch = []
+    for item_id, signature, title, description, location in rows.iterator(chunk_size=1000):
+        if not indexable(item_text(title, description, location)):
+            continue
+        batch.extend(ItemFingerprintBand(item_id=item_id, bucket=bucket) for bucket in band_buckets(signature))
+        if len(batch) >= 5000:
+            ItemFingerprintBand.objects.bulk_create(batch)
+            batch = []
+    ItemFingerprintBand.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_item_stat_events'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_bands, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-19 23:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def assign_tombstone_organization(apps, schema_editor):
+    # Archived items keep their campus in the archive; tombstones of
+    # hard-deleted items can only be given the default campus
+    Organization = apps.get_model('core', 'Organization')
+    ArchivedItem = apps.get_model('core', 'ArchivedItem')
+    ItemDeletion = apps.get_model('core', 'ItemDeletion')
+    archived = ArchivedItem.objects.filter(original_id=models.OuterRef('item_id')).values('organization_id')[:1]
+    ItemDeletion.objects.filter(reason='archived').update(organization_id=models.Subquery(archived))
+    if ItemDeletion.objects.filter(organization__isnull=True).exists():
+        org, _ = Organization.objects.get_or_create(slug='default', defaults={'name': 'Default campus'})
+        ItemDeletion.objects.filter(organization__isnull=True).update(organization=org)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_rebuild_dedup_bands'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itemdeletion',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='item_deletions', to='core.organization'),
+        ),
+        migrations.RunPython(assign_tombstone_organization, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 
 # Django ORM models below define the data schema.
@@ -6,10 +8,27 @@ from django.contrib.auth.models import AbstractUser
 # Run: python manage.py makemigrations -> creates migration files (SQL plan)
 # Run: python manage.py migrate -> applies generated SQL to MySQL (findit_db)
 
+class Organization(models.Model):
+    # Campus/tenant. Requests are mapped to one by core/tenancy.py (host or
+    # header); db_alias optionally routes the tenant's queries to its own database.
+    name = models.CharField(max_length=255)
+    slug = models.SlugField(max_length=50, unique=True)
+    domain = models.CharField(max_length=255, unique=True, blank=True, null=True)
+    db_alias = models.CharField(max_length=50, blank=True, null=True)
+    active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'organizations'
+
+    def __str__(self):
+        return self.name
+
 class User(AbstractUser):
     # Extends the built-in Django user with app-specific fields.
     # Stored in MySQL table 'users' (see Meta.db_table).
     
+    email = models.EmailField('email address', unique=True) # Login key (core/backends.py)
     phone = models.CharField(max_length=50, blank=True, null=True)
     location = models.CharField(max_length=255, blank=True, null=True)
     bio = models.TextField(blank=True, null=True)
@@ -19,6 +38,9 @@ class User(AbstractUser):
     sms_notifications = models.BooleanField(default=False)
     profile_visibility = models.CharField(max_length=50, default='members')
     show_phone = models.BooleanField(default=False)
+    unread_messages = models.IntegerField(default=0) # Maintained on write by core/messaging.py
+    version = models.PositiveIntegerField(default=1) # Optimistic concurrency (core/versioning.py)
+    organization = models.ForeignKey(Organization, on_delete=models.PROTECT, null=True, blank=True, related_name='users')
     
     # We don't need join_date or last_login as AbstractUser provides date_joined and last_login.
 
@@ -27,7 +49,8 @@ class User(AbstractUser):
 
 class Category(models.Model):
     # Item category reference data
-    name = models.CharField(max_length=255, unique=True)
+    organization = models.ForeignKey(Organization, on_delete=models.PROTECT, null=True, blank=True, related_name='categories')
+    name = models.CharField(max_length=255)
     emoji = models.CharField(max_length=50, blank=True, null=True)
     description = models.TextField(blank=True, null=True)
     item_count = models.IntegerField(default=0)
@@ -35,6 +58,10 @@ class Category(models.Model):
     class Meta:
         db_table = 'categories'
         verbose_name_plural = 'Categories'
+        constraints = [
+            # Each campus keeps its own category list
+            models.UniqueConstraint(fields=['organization', 'name'], name='category_org_name_uniq'),
+        ]
 
     def __str__(self):
         return self.name
@@ -64,13 +91,60 @@ class Item(models.Model):
     date_reported = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     views = models.IntegerField(default=0)
+    image_hash = models.BigIntegerField(blank=True, null=True) # 64-bit dHash of the photo (core/imagehash.py)
+    version = models.PositiveIntegerField(default=1) # Optimistic concurrency (core/versioning.py)
+    organization = models.ForeignKey(Organization, on_delete=models.PROTECT, null=True, blank=True, related_name='items')
 
     class Meta:
         db_table = 'items' # Explicit table name
+        indexes = [
+            # Tenant-scoped api_items: browse list, status filter and delta sync
+            models.Index(fields=['organization', '-date_reported'], name='item_org_reported_idx'),
+            models.Index(fields=['organization', 'status', '-date_reported'], name='item_org_status_idx'),
+            models.Index(fields=['organization', 'updated_at', 'id'], name='item_org_updated_idx'),
+            # Used by archive_items to find recovered/stale rows without a full scan
+            models.Index(fields=['status', 'date_reported'], name='item_status_reported_idx'),
+            # Delta sync: rows changed since a client's sync token
+            models.Index(fields=['updated_at', 'id'], name='item_updated_idx'),
+            # Admin changelist: date_hierarchy bounds and '^title' prefix search
+            models.Index(fields=['date_reported'], name='item_reported_idx'),
+            models.Index(fields=['title'], name='item_title_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+class ItemDeletion(models.Model):
+    # Tombstone for an item removed from the 'items' table (deleted or
+    # archived), so delta-sync clients can drop it from their cache.
+    item_id = models.BigIntegerField()
+    user_id = models.BigIntegerField(blank=True, null=True) # Owner at deletion time, for ?user_id= syncs
+    organization = models.ForeignKey(Organization, on_delete=models.PROTECT, null=True, blank=True, related_name='item_deletions')
+    reason = models.CharField(max_length=20, default='deleted')
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = 'item_deletions'
+
+class ItemFingerprint(models.Model):
+    # MinHash signature of an item's text (core/dedup.py) and the earlier
+    # report it was flagged as a likely duplicate of, if any.
+    item = models.OneToOneField(Item, on_delete=models.CASCADE, primary_key=True, related_name='fingerprint')
+    signature = models.JSONField()
+    duplicate_of = models.ForeignKey(Item, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    similarity = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'item_fingerprints'
+
+class ItemFingerprintBand(models.Model):
+    # LSH band index: one row per (item, band bucket)
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='fingerprint_bands')
+    bucket = models.BigIntegerField(db_index=True)
+
+    class Meta:
+        db_table = 'item_fingerprint_bands'
+
 class Claim(models.Model):
     # Ownership claim made by a user for an item
     STATUS_CHOICES = [
@@ -87,13 +161,58 @@ class Claim(models.Model):
     verification_details = models.TextField(blank=True, null=True)
     status = models.CharField(max_length=50, default='pending', choices=STATUS_CHOICES)
     created_at = models.DateTimeField(auto_now_add=True)
+    organization = models.ForeignKey(Organization, on_delete=models.PROTECT, null=True, blank=True, related_name='claims')
 
     class Meta:
         db_table = 'claims'
+        indexes = [
+            # Pending claims per campus (admin review queue)
+            models.Index(fields=['organization', 'status', '-id'], name='claim_org_status_idx'),
+        ]
+
+class Conversation(models.Model):
+    # Message thread grouped by (item, participants).
+    # user_low/user_high hold the two participants ordered by id so the
+    # unique constraint catches both directions of the same pair.
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='conversations')
+    user_low = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    user_high = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    last_message = models.ForeignKey('Message', on_delete=models.SET_NULL, null=True, related_name='+')
+    last_message_at = models.DateTimeField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'conversations'
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'user_low', 'user_high'], name='conversation_item_pair_uniq'),
+        ]
+
+class ConversationParticipant(models.Model):
+    # One row per (conversation, user): the user's inbox entry for a thread.
+    # last_message_at is copied from the conversation so an inbox page is a
+    # single range scan on (user, last_message_at).
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='participants')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversation_entries')
+    peer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    unread_count = models.IntegerField(default=0)
+    last_message_at = models.DateTimeField(null=True)
+    last_read_at = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = 'conversation_participants'
+        constraints = [
+            models.UniqueConstraint(fields=['conversation', 'user'], name='participant_conversation_user_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-last_message_at', '-id'], name='participant_inbox_idx'),
+        ]
 
 class Message(models.Model):
     # Direct message related to an item
     item = models.ForeignKey(Item, on_delete=models.CASCADE)
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, null=True, related_name='messages')
+    sender = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='sent_messages')
+    receiver = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='received_messages')
     sender_name = models.CharField(max_length=255)
     sender_email = models.CharField(max_length=255)
     receiver_email = models.CharField(max_length=255)
@@ -104,6 +223,13 @@ class Message(models.Model):
 
     class Meta:
         db_table = 'messages'
+        indexes = [
+            # Inbox/outbox and thread history are keyset-paginated on id
+            models.Index(fields=['receiver', '-id'], name='message_inbox_idx'),
+            models.Index(fields=['sender', '-id'], name='message_outbox_idx'),
+            models.Index(fields=['conversation', '-id'], name='message_thread_idx'),
+            models.Index(fields=['receiver_email'], name='message_receiver_email_idx'),
+        ]
 
 class Notification(models.Model):
     # In-app notification for user actions and updates
@@ -114,9 +240,45 @@ class Notification(models.Model):
     message = models.TextField()
     read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set by task handlers so a retried task does not notify twice (e.g. 'claim:<id>')
+    dedup_key = models.CharField(max_length=100, unique=True, null=True, blank=True)
 
     class Meta:
         db_table = 'notifications'
+        indexes = [
+            # Unread notifications for a user, newest first (dashboard)
+            models.Index(fields=['user', 'read', '-id'], name='notification_unread_idx'),
+        ]
+
+class SavedSearch(models.Model):
+    # Saved-search subscription: notify the user about new items matching
+    # status/category/location and every keyword
+    STATUS_CHOICES = [
+        ('lost', 'Lost'),
+        ('found', 'Found'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='saved_searches')
+    name = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, blank=True, null=True) # Null matches both
+    category = models.CharField(max_length=50, blank=True, null=True)
+    keywords = models.CharField(max_length=255, blank=True, null=True)
+    location = models.CharField(max_length=255, blank=True, null=True)
+    active = models.BooleanField(default=True)
+    last_matched_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'saved_searches'
+
+class SavedSearchTerm(models.Model):
+    # Reverse index over saved searches: one row per (search, anchor term).
+    # A new item looks up only the searches anchored on one of its own terms.
+    search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='terms')
+    term = models.CharField(max_length=120, db_index=True)
+
+    class Meta:
+        db_table = 'saved_search_terms'
 
 class ActivityLog(models.Model):
     # Audit log of actions performed in the system
@@ -129,3 +291,134 @@ class ActivityLog(models.Model):
 
     class Meta:
         db_table = 'activity_log'
+        indexes = [
+            # Admin audit queries filter on one column and page by id
+            models.Index(fields=['user', '-id'], name='activity_user_idx'),
+            models.Index(fields=['item', '-id'], name='activity_item_idx'),
+            models.Index(fields=['action', '-id'], name='activity_action_idx'),
+        ]
+
+class ItemStatEvent(models.Model):
+    # Report/recovery event for the analytics rollups (core/analytics.py),
+    # written in the same transaction as the item change. Category and
+    # location are copied so later edits, archival or deletion of the item
+    # do not move or drop the event.
+    EVENT_CHOICES = [
+        ('lost', 'Lost'),
+        ('found', 'Found'),
+        ('recovered', 'Recovered'),
+    ]
+
+    item_id = models.BigIntegerField()
+    event = models.CharField(max_length=20, choices=EVENT_CHOICES)
+    category = models.CharField(max_length=50, blank=True, default='')
+    location = models.CharField(max_length=255, blank=True, default='')
+    organization = models.ForeignKey(Organization, on_delete=models.PROTECT, null=True, blank=True, related_name='stat_events')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'item_stat_events'
+
+class ItemStatRollup(models.Model):
+    # Pre-aggregated report/recovery counts per campus, time bucket and
+    # dimension (core/analytics.py). dimension is 'all', 'category' or
+    # 'location' (location only at daily grain); value is the category/location.
+    PERIOD_CHOICES = [
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+    ]
+
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    bucket = models.DateTimeField()
+    event = models.CharField(max_length=20) # lost, found or recovered
+    dimension = models.CharField(max_length=20)
+    value = models.CharField(max_length=100, blank=True, default='')
+    count = models.IntegerField(default=0)
+    organization = models.ForeignKey(Organization, on_delete=models.PROTECT, null=True, blank=True, related_name='stat_rollups')
+
+    class Meta:
+        db_table = 'item_stat_rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'period', 'dimension', 'bucket', 'event', 'value'], name='item_stat_rollup_key'
+            ),
+        ]
+
+class StatRollupState(models.Model):
+    # Last event id folded into the rollups, one row per source
+    source = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'item_stat_rollup_state'
+
+class ArchivedItem(models.Model):
+    # Cold copy of an Item moved out of the hot 'items' table by the
+    # archive_items management command. Claims, messages and notifications
+    # that referenced the item are kept as JSON in 'related'.
+    original_id = models.BigIntegerField(unique=True)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='archived_items')
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    status = models.CharField(max_length=50, choices=Item.STATUS_CHOICES)
+    category = models.CharField(max_length=50)
+    location = models.CharField(max_length=255)
+    date = models.CharField(max_length=50)
+    time = models.CharField(max_length=50, blank=True, null=True)
+    posted_by = models.CharField(max_length=255)
+    contact = models.CharField(max_length=255)
+    reward = models.CharField(max_length=255, blank=True, null=True)
+    additional_info = models.TextField(blank=True, null=True)
+    image_path = models.CharField(max_length=255, blank=True, null=True)
+    current_location = models.CharField(max_length=255, blank=True, null=True)
+    date_reported = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    views = models.IntegerField(default=0)
+    related = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    organization = models.ForeignKey(Organization, on_delete=models.PROTECT, null=True, blank=True, related_name='archived_items')
+
+    class Meta:
+        db_table = 'items_archive'
+        indexes = [
+            models.Index(fields=['organization', '-date_reported'], name='archive_org_reported_idx'),
+            models.Index(fields=['status', '-date_reported'], name='archive_status_reported_idx'),
+            models.Index(fields=['user', '-date_reported'], name='archive_user_reported_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+class Task(models.Model):
+    # Background job row consumed by the run_tasks worker (core/tasks.py).
+    # idempotency_key makes re-enqueueing the same side effect a no-op.
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=20, default='pending', choices=STATUS_CHOICES)
+    idempotency_key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True, null=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'tasks'
+        indexes = [
+            # Worker poll: oldest due task first
+            models.Index(fields=['status', 'run_at'], name='task_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
@@ -0,0 +1,42 @@
+# Keyset pagination helpers shared by the list APIs.
+# Pages are addressed by "the id of the last row you saw" instead of an
+# OFFSET, so page N costs the same index range scan as page 1.
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def page_size(value):
+    # Clamp a ?limit= query value to [1, MAX_PAGE_SIZE]
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def parse_before(value):
+    # ?before= as a row id, None when absent; ValueError when not a positive integer
+    if not value:
+        return None
+    try:
+        before = int(value)
+    except ValueError:
+        raise ValueError('before must be a row id')
+    if before < 1:
+        raise ValueError('before must be a row id')
+    return before
+
+
+def keyset_page(queryset, before=None, limit=DEFAULT_PAGE_SIZE):
+    # Rows ordered by id, newest first, strictly below 'before'.
+    # Returns (rows, next_before); next_before is None on the last page.
+    rows = queryset.order_by('-id')
+    if before:
+        rows = rows.filter(id__lt=before)
+    rows = list(rows[:limit + 1])
+    next_before = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_before = rows[-1].id
+    return rows, next_before
@@ -0,0 +1,163 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import SavedSearch, SavedSearchTerm, Notification
+from .suggest import normalize
+
+# Saved-search matching ("percolation") for new items.
+# Instead of testing every subscription against every new item, each saved
+# search is filed under one anchor term in 'saved_search_terms': its longest
+# keyword, else its longest location word, else its category, prefixed by
+# the status it watches. A new item builds the same kind of terms from its
+# own text and loads only the searches anchored on one of them, then checks
+# the remaining criteria in Python. The work per item depends on how many
+# searches could match it, not on how many searches exist.
+# Category-only searches all share their category's anchor, so an item would
+# load every one of them; their anchor already encodes everything they test,
+# so they are read as plain (user, search) rows with no check in Python.
+# MAX_NOTIFIED caps the matches per item, in search id order.
+
+SAVED_SEARCH_SETTINGS = {
+    'ENABLED': True,
+    'MAX_PER_USER': 20,
+    'MAX_NOTIFIED': 5000,  # users notified about one item
+    'BATCH_SIZE': 1000,
+}
+SAVED_SEARCH_SETTINGS.update(getattr(settings, 'SAVED_SEARCHES', {}))
+
+STATUSES = ('lost', 'found')
+TERM_LENGTH = 100
+
+
+def words(text):
+    return set(normalize(text).split())
+
+
+def anchor(search):
+    # (kind, value) used to file the search, or None if it has no criteria
+    keywords = words(search.keywords)
+    if keywords:
+        return 'w', max(sorted(keywords), key=len)
+    location = words(search.location)
+    if location:
+        return 'l', max(sorted(location), key=len)
+    if normalize(search.category):
+        return 'c', normalize(search.category)
+    return None
+
+
+def make_term(status, kind, value):
+    return f"{status}:{kind}:{value}"[:TERM_LENGTH]
+
+
+def search_terms(search):
+    kind_value = anchor(search)
+    if kind_value is None:
+        return []
+    statuses = [search.status] if search.status else STATUSES
+    return [make_term(status, *kind_value) for status in statuses]
+
+
+def item_terms(item):
+    # Every keyword/location term a search matching this item could be anchored on
+    terms = [make_term(item.status, 'w', w) for w in words(f"{item.title} {item.description}")]
+    terms += [make_term(item.status, 'l', w) for w in words(item.location)]
+    return terms
+
+
+def category_term(item):
+    # Anchor of the category-only searches this item matches, or None
+    category = normalize(item.category)
+    return make_term(item.status, 'c', category) if category else None
+
+
+def matches(search, item):
+    if search.status and search.status != item.status:
+        return False
+    if search.category and normalize(search.category) != normalize(item.category):
+        return False
+    if not words(search.keywords) <= words(f"{item.title} {item.description}"):
+        return False
+    if not words(search.location) <= words(item.location):
+        return False
+    return True
+
+
+def save_search(user, name, status=None, category=None, keywords=None, location=None):
+    # Create a subscription and its index rows; raises ValueError on bad input
+    if status and status not in STATUSES:
+        raise ValueError('status must be lost or found')
+    search = SavedSearch(
+        user=user, name=name, status=status or None, category=category or None,
+        keywords=keywords or None, location=location or None,
+    )
+    terms = search_terms(search)
+    if not terms:
+        raise ValueError('A saved search needs keywords, a location or a category')
+    if SavedSearch.objects.filter(user=user, active=True).count() >= SAVED_SEARCH_SETTINGS['MAX_PER_USER']:
+        raise ValueError('Saved search limit reached')
+    with transaction.atomic():
+        search.save()
+        SavedSearchTerm.objects.bulk_create([SavedSearchTerm(search=search, term=term) for term in terms])
+    return search
+
+
+def match_item(item):
+    # Notify every user with a matching saved search; returns the number notified
+    if not SAVED_SEARCH_SETTINGS['ENABLED']:
+        return 0
+    limit = SAVED_SEARCH_SETTINGS['MAX_NOTIFIED']
+    batch_size = SAVED_SEARCH_SETTINGS['BATCH_SIZE']
+    searches = (
+        SavedSearch.objects.filter(active=True)
+        .filter(user__organization_id=item.organization_id)  # subscribers on the item's campus
+        .exclude(user_id=item.user_id)
+    )
+    notified = {}  # user_id -> (search id, search name)
+    candidates = searches.filter(terms__term__in=item_terms(item)).distinct().order_by('id')
+    for search in candidates.iterator(chunk_size=batch_size):
+        if len(notified) >= limit:
+            break
+        if search.user_id not in notified and matches(search, item):
+            notified[search.user_id] = (search.id, search.name)
+    term = category_term(item)
+    if term is not None and len(notified) < limit:
+        rows = searches.filter(terms__term=term).order_by('id').values_list('id', 'user_id', 'name')
+        for search_id, user_id, name in rows.iterator(chunk_size=batch_size):
+            if len(notified) >= limit:
+                break
+            notified.setdefault(user_id, (search_id, name))
+    if not notified:
+        return 0
+    # Runs as a retryable task: the dedup key makes a rerun skip users already notified
+    with transaction.atomic():
+        Notification.objects.bulk_create([
+            Notification(
+                user_id=user_id,
+                item=item,
+                type='saved_search',
+                title=f"New {item.status} item matches \"{name}\"",
+                message=f"{item.title} ({item.location})",
+                dedup_key=f"saved-search:{item.id}:{user_id}",
+            )
+            for user_id, (_, name) in notified.items()
+        ], batch_size=batch_size, ignore_conflicts=True)
+        matched = [search_id for search_id, _ in notified.values()]
+        for start in range(0, len(matched), batch_size):
+            SavedSearch.objects.filter(id__in=matched[start:start + batch_size]).update(last_matched_at=timezone.now())
+    return len(notified)
+
+
+def search_to_dict(search):
+    return {
+        'id': search.id,
+        'name': search.name,
+        'status': search.status,
+        'category': search.category,
+        'keywords': search.keywords,
+        'location': search.location,
+        'active': search.active,
+        'last_matched_at': search.last_matched_at.isoformat() if search.last_matched_at else None,
+        'created_at': search.created_at.isoformat(),
+    }
@@ -0,0 +1,84 @@
+import gc
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.template.backends.jinja2 import Jinja2
+from django.urls import get_resolver
+
+# Worker startup.
+# preload() does the work a worker would otherwise repeat after the first
+# requests arrive: it fills the model metadata caches and compiles one query
+# per model, populates the URL resolver, compiles every Jinja2 template and,
+# with WARM_INDEXES, builds the suggest and image indexes (without PRELOAD,
+# WARM_INDEXES starts those builds in the background instead). Run it in the
+# master (findit_django/wsgi.py under 'gunicorn --preload') so workers fork
+# with all of this already in memory and share it copy-on-write. The GC is
+# then frozen: collections in a worker would otherwise write to every
+# preloaded object's header and unshare its page.
+
+STARTUP_SETTINGS = {
+    'PRELOAD': False,
+    'WARM_INDEXES': False,  # needs the database at boot; otherwise indexes build on first use
+    'FREEZE_GC': True,
+}
+STARTUP_SETTINGS.update(getattr(settings, 'STARTUP', {}))
+
+
+def warm_orm():
+    for model in apps.get_models():
+        # get_fields() also builds the reverse relation tree for every model
+        model._meta.get_fields()
+        queryset = model._default_manager.all()
+        # Loads the database backend's operations/compiler without connecting
+        queryset.query.get_compiler(using=queryset.db).as_sql()
+
+
+def warm_urls():
+    resolver = get_resolver()
+    resolver.reverse_dict  # populates the reverse/namespace tables
+    return len(resolver.url_patterns)
+
+
+def warm_templates():
+    compiled = 0
+    for engine in engines.all():
+        if not isinstance(engine, Jinja2):
+            continue
+        for name in engine.env.list_templates(extensions=('html',)):
+            engine.env.get_template(name)
+            compiled += 1
+    return compiled
+
+
+def warm_indexes():
+    from . import imagehash, suggest
+    suggest.index.refresh()
+    imagehash.index.refresh()
+
+
+def start_indexes():
+    # Without preload each worker imports wsgi.py itself: build in the background
+    from . import imagehash, suggest
+    suggest.index.start_refresh()
+    imagehash.index.start_refresh()
+
+
+def preload():
+    # Warm this process before it forks workers; returns {step: milliseconds}
+    steps = [('orm', warm_orm), ('urls', warm_urls), ('templates', warm_templates)]
+    if STARTUP_SETTINGS['WARM_INDEXES']:
+        steps.append(('indexes', warm_indexes))
+    timings = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    # Workers must not inherit an open database socket
+    connections.close_all()
+    if STARTUP_SETTINGS['FREEZE_GC']:
+        gc.collect()
+        gc.freeze()
+    return timings
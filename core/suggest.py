@@ -0,0 +1,274 @@
+import bisect
+import re
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Item, Category
+
+# Typeahead suggestions for the browse page.
+# Each kind ('title', 'location', 'category') keeps a sorted list of
+# normalized terms plus a usage count per term, separately for each campus
+# (organization), so one campus never sees another's titles, locations or
+# categories; a prefix lookup is a bisect into that list and a short scan,
+# so it never touches the database. The per-process index is built from
+# values_list() at startup (core/startup.py) or by a background thread on
+# first use, kept current by Item save/delete signals and rebuilt in the
+# background every REFRESH_SECONDS to pick up writes made by other
+# processes. Requests never wait for a build: until the
+# first one finishes they get no suggestions. MAX_ENTRIES bounds its memory,
+# counting each term, each item and each item-to-term reference: once full,
+# new terms and items are dropped (and counted) until the next rebuild.
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_SETTINGS = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 1000000,   # terms + items + item term references
+    'SCAN_LIMIT': 500,        # terms examined per kind for one prefix
+    'MIN_TOKEN_LENGTH': 2,    # shorter title words are not indexed
+    'REFRESH_SECONDS': 300,
+}
+SUGGEST_SETTINGS.update(getattr(settings, 'SUGGEST', {}))
+
+KINDS = ('title', 'location', 'category')
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 25
+
+
+def normalize(text):
+    return ' '.join(re.findall(r'[a-z0-9]+', (text or '').lower()))
+
+
+def item_terms(title, location, category):
+    # [(kind, term, display)] contributed by one item
+    terms = []
+    for token in set(normalize(title).split()):
+        if len(token) >= SUGGEST_SETTINGS['MIN_TOKEN_LENGTH']:
+            terms.append(('title', token, token))
+    if normalize(location):
+        terms.append(('location', normalize(location), location.strip()))
+    if normalize(category):
+        terms.append(('category', normalize(category), category))
+    return terms
+
+
+class PrefixIndex:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.keys = {}  # (organization_id, kind) -> sorted terms
+        # (organization_id, kind, term) -> [count, display, key]; count is the
+        # number of items using the term and key is the one shared tuple that
+        # items point at
+        self.terms = {}
+        self.items = {}     # item_id -> tuple of the term keys it contributed
+        self.size = 0       # entries counted against max_entries
+        self.dropped = 0
+
+    def _incr(self, organization_id, kind, term, display):
+        # Returns the shared key, or None when the term budget is exhausted
+        entry = self.terms.get((organization_id, kind, term))
+        if entry is not None:
+            entry[0] += 1
+            return entry[2]
+        if self.size >= self.max_entries:
+            self.dropped += 1
+            return None
+        key = (organization_id, kind, term)
+        self.terms[key] = [1, display, key]
+        self.size += 1
+        bisect.insort(self.keys.setdefault((organization_id, kind), []), term)
+        return key
+
+    def _decr(self, key):
+        entry = self.terms.get(key)
+        if entry is None:
+            return
+        if entry[0] > 1:
+            entry[0] -= 1
+            return
+        del self.terms[key]
+        self.size -= 1
+        organization_id, kind, term = key
+        keys = self.keys[(organization_id, kind)]
+        position = bisect.bisect_left(keys, term)
+        if position < len(keys) and keys[position] == term:
+            del keys[position]
+
+    def add_term(self, organization_id, kind, term, display):
+        # Reference data (categories) that is not tied to an item
+        self._incr(organization_id, kind, term, display)
+
+    def add_item(self, item_id, organization_id, title, location, category):
+        self.remove_item(item_id)
+        terms = item_terms(title, location, category)
+        # The item's own entry and its references; new terms are counted in _incr
+        if self.size + 1 + len(terms) > self.max_entries:
+            self.dropped += 1
+            return
+        added = []
+        for kind, term, display in terms:
+            key = self._incr(organization_id, kind, term, display)
+            if key is not None:
+                added.append(key)
+        self.items[item_id] = tuple(added)
+        self.size += 1 + len(added)
+
+    def remove_item(self, item_id):
+        keys = self.items.pop(item_id, None)
+        if keys is None:
+            return
+        self.size -= 1 + len(keys)
+        for key in keys:
+            self._decr(key)
+
+    def search(self, prefix, kind, limit, organization_id=None, every_campus=False):
+        # Most used terms of 'kind' starting with prefix, for one campus or,
+        # with every_campus, summed over all of them
+        if every_campus:
+            sources = [(campus, keys) for (campus, key_kind), keys in self.keys.items() if key_kind == kind]
+        else:
+            sources = [(organization_id, self.keys.get((organization_id, kind), []))]
+        counts = {}
+        displays = {}
+        for campus, keys in sources:
+            start = bisect.bisect_left(keys, prefix)
+            for term in keys[start:start + SUGGEST_SETTINGS['SCAN_LIMIT']]:
+                if not term.startswith(prefix):
+                    break
+                count, display, _ = self.terms[(campus, kind, term)]
+                counts[term] = counts.get(term, 0) + count
+                displays.setdefault(term, display)
+        matches = sorted((-count, term) for term, count in counts.items())
+        return [
+            {'text': displays[term], 'kind': kind, 'count': -negative}
+            for negative, term in matches[:limit]
+        ]
+
+    def stats(self):
+        per_kind = {kind: 0 for kind in KINDS}
+        for (_, kind), keys in self.keys.items():
+            per_kind[kind] += len(keys)
+        return {
+            'terms': len(self.terms),
+            'items': len(self.items),
+            'entries': self.size,
+            'dropped': self.dropped,
+            'campuses': len({campus for campus, _ in self.keys}),
+            **per_kind,
+        }
+
+
+class SuggestIndex:
+    # Per-process PrefixIndex, rebuilt off the request path every REFRESH_SECONDS.
+    # The lock guards the live index: searches, signal updates and the swap.
+    def __init__(self):
+        self._index = PrefixIndex(SUGGEST_SETTINGS['MAX_ENTRIES'])
+        self._built_at = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pending = None  # signal updates made while a rebuild runs
+
+    def current(self):
+        # The live index, possibly still empty; starts a rebuild when stale
+        if self._built_at is None or time.monotonic() - self._built_at > SUGGEST_SETTINGS['REFRESH_SECONDS']:
+            self.start_refresh()
+        return self._index
+
+    def refresh(self):
+        # Build a new index without holding the lock, then swap it in with
+        # the updates that arrived during the build replayed on top
+        with self._lock:
+            self._pending = []
+        try:
+            built = self.build()
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            for method, args in self._pending:
+                getattr(built, method)(*args)
+            self._pending = None
+            self._index = built
+            self._built_at = time.monotonic()
+
+    def start_refresh(self):
+        # Rebuild in a background thread (one per process, again after a fork)
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run_refresh, name='suggest-index', daemon=True)
+            self._thread.start()
+
+    def _run_refresh(self):
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Suggest index rebuild failed")
+        finally:
+            close_old_connections()
+
+    def build(self):
+        built = PrefixIndex(SUGGEST_SETTINGS['MAX_ENTRIES'])
+        for organization_id, name in Category.objects.values_list('organization_id', 'name'):
+            if normalize(name):
+                built.add_term(organization_id, 'category', normalize(name), name)
+        rows = Item.objects.values_list('id', 'organization_id', 'title', 'location', 'category')
+        for item_id, organization_id, title, location, category in rows.iterator(chunk_size=5000):
+            built.add_item(item_id, organization_id, title, location, category)
+        return built
+
+    def _apply(self, method, *args):
+        with self._lock:
+            getattr(self._index, method)(*args)
+            if self._pending is not None:
+                self._pending.append((method, args))
+
+    def update_item(self, item):
+        # Apply a saved item to this process's index (and to a rebuild in progress)
+        self._apply('add_item', item.id, item.organization_id, item.title, item.location, item.category)
+
+    def remove_item(self, item_id):
+        self._apply('remove_item', item_id)
+
+    def suggest(self, query, kinds=KINDS, limit=DEFAULT_LIMIT, organization=None):
+        # organization: the requesting campus, None (tenancy off) for all of them
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        self.current()
+        results = []
+        # Under the lock: a concurrent remove_item could drop a term mid-scan
+        with self._lock:
+            built = self._index
+            for kind in kinds:
+                # Titles are indexed per word, so complete the last word typed
+                prefix = normalized.split()[-1] if kind == 'title' else normalized
+                results.extend(built.search(
+                    prefix, kind, limit,
+                    organization_id=organization.id if organization is not None else None,
+                    every_campus=organization is None,
+                ))
+        results.sort(key=lambda entry: -entry['count'])
+        return results[:limit]
+
+
+index = SuggestIndex()
+
+
+@receiver(post_save, sender=Item, dispatch_uid='suggest_item_saved')
+def item_saved(sender, instance, **kwargs):
+    if SUGGEST_SETTINGS['ENABLED']:
+        index.update_item(instance)
+
+
+@receiver(post_delete, sender=Item, dispatch_uid='suggest_item_deleted')
+def item_deleted(sender, instance, **kwargs):
+    if SUGGEST_SETTINGS['ENABLED']:
+        index.remove_item(instance.id)
@@ -0,0 +1,249 @@
+import logging
+import os
+import socket
+import traceback
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Item, Claim, Notification, Task
+from . import imagehash, saved_searches
+
+# Database-backed task queue.
+# Views call enqueue() to record a side effect (notification fan-out, email,
+# SMS) as a row in 'tasks'; the run_tasks management command claims due rows
+# in batches and runs the registered handler off the request thread.
+#
+# Handlers are registered with @task(name) and run once per task. A handler
+# registered with shared=<context manager factory> also receives the value
+# it yields, opened once per claimed batch (e.g. one SMTP session for a
+# batch of emails); each task is still run and finished on its own, so a
+# failure only retries that task.
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SETTINGS = {
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 30,        # seconds, doubled per attempt
+    'VISIBILITY_TIMEOUT': 300,  # seconds before a 'running' task is reclaimed
+    'DONE_RETENTION_DAYS': 30,  # finished tasks (and their keys) kept this long
+    'EAGER': False,             # run handlers inline (tests/debugging)
+}
+QUEUE_SETTINGS.update(getattr(settings, 'TASK_QUEUE', {}))
+
+_registry = {}
+
+
+def task(name, shared=None):
+    def register(func):
+        _registry[name] = (func, shared)
+        return func
+    return register
+
+
+def enqueue(name, payload=None, key=None, delay=0, max_attempts=None):
+    # Record a task; returns the Task row (the existing one if key was already used)
+    if name not in _registry:
+        raise ValueError(f"Unknown task: {name}")
+    fields = {
+        'name': name,
+        'payload': payload or {},
+        'idempotency_key': key,
+        'run_at': timezone.now() + timedelta(seconds=delay),
+        'max_attempts': max_attempts or QUEUE_SETTINGS['MAX_ATTEMPTS'],
+    }
+    if key is not None:
+        try:
+            with transaction.atomic():
+                queued = Task.objects.create(**fields)
+        except IntegrityError:
+            return Task.objects.get(idempotency_key=key)
+    else:
+        queued = Task.objects.create(**fields)
+
+    if QUEUE_SETTINGS['EAGER']:
+        transaction.on_commit(lambda: run_tasks([queued]))
+    return queued
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+LOST_ERROR = 'Worker stopped before finishing (visibility timeout)'
+
+
+def claim_batch(limit=None, worker=None):
+    # Lock and mark up to 'limit' due tasks as running for this worker
+    now = timezone.now()
+    stale = now - timedelta(seconds=QUEUE_SETTINGS['VISIBILITY_TIMEOUT'])
+    with transaction.atomic():
+        due = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='pending', run_at__lte=now) | Q(status='running', locked_at__lt=stale))
+            .order_by('run_at', 'id')[:limit or QUEUE_SETTINGS['BATCH_SIZE']]
+        )
+        # A reclaimed task's last run never finished (e.g. it crashed the
+        # worker); count it as a failed attempt so such a task cannot loop forever
+        reclaimed = [queued for queued in due if queued.status == 'running']
+        if reclaimed:
+            Task.objects.filter(id__in=[t.id for t in reclaimed]).update(
+                attempts=F('attempts') + 1, last_error=LOST_ERROR
+            )
+            exhausted = []
+            for queued in reclaimed:
+                queued.attempts += 1
+                queued.last_error = LOST_ERROR
+                if queued.attempts >= queued.max_attempts:
+                    exhausted.append(queued)
+                    logger.error("Task %s #%s failed permanently: %s", queued.name, queued.id, LOST_ERROR)
+            if exhausted:
+                Task.objects.filter(id__in=[t.id for t in exhausted]).update(
+                    status='failed', locked_by=None, locked_at=None
+                )
+                due = [queued for queued in due if queued not in exhausted]
+        if due:
+            Task.objects.filter(id__in=[t.id for t in due]).update(
+                status='running', locked_by=worker or worker_id(), locked_at=now
+            )
+    return due
+
+
+def _finish(queued, error=None):
+    queued.attempts += 1
+    if error is None:
+        queued.status = 'done'
+        queued.last_error = None
+    elif queued.attempts >= queued.max_attempts:
+        queued.status = 'failed'
+        queued.last_error = error
+        logger.error("Task %s #%s failed permanently: %s", queued.name, queued.id, error)
+    else:
+        queued.status = 'pending'
+        queued.last_error = error
+        backoff = QUEUE_SETTINGS['RETRY_BACKOFF'] * (2 ** (queued.attempts - 1))
+        queued.run_at = timezone.now() + timedelta(seconds=backoff)
+    queued.locked_by = None
+    queued.locked_at = None
+    queued.save(update_fields=['status', 'attempts', 'last_error', 'run_at', 'locked_by', 'locked_at', 'updated_at'])
+
+
+def run_tasks(batch):
+    # Run a claimed batch, grouping tasks by name so a shared resource is
+    # opened once per group. Returns (succeeded, failed) counts.
+    succeeded = failed = 0
+    groups = {}
+    for queued in batch:
+        groups.setdefault(queued.name, []).append(queued)
+
+    for name, tasks in groups.items():
+        func, shared = _registry.get(name, (None, None))
+        if func is None:
+            for queued in tasks:
+                _finish(queued, f"Unknown task: {name}")
+            failed += len(tasks)
+            continue
+        finished = set()
+        try:
+            with shared() if shared else nullcontext() as resource:
+                for queued in tasks:
+                    try:
+                        if shared:
+                            func(queued.payload, resource)
+                        else:
+                            func(queued.payload)
+                        _finish(queued)
+                        succeeded += 1
+                    except Exception:
+                        _finish(queued, traceback.format_exc())
+                        failed += 1
+                    finished.add(queued.id)
+        except Exception:
+            # Opening the shared resource failed: retry the tasks that did not run
+            error = traceback.format_exc()
+            for queued in tasks:
+                if queued.id not in finished:
+                    _finish(queued, error)
+                    failed += 1
+    return succeeded, failed
+
+
+def purge_done(now=None):
+    # Delete tasks that finished more than DONE_RETENTION_DAYS ago; their
+    # idempotency keys can be reused after that. Failed tasks are kept for
+    # inspection. A done task ran after its run_at, so the run_at bound lets
+    # the delete use task_due_idx.
+    horizon = (now or timezone.now()) - timedelta(days=QUEUE_SETTINGS['DONE_RETENTION_DAYS'])
+    deleted, _ = Task.objects.filter(status='done', run_at__lt=horizon, updated_at__lt=horizon).delete()
+    return deleted
+
+
+# --- Task handlers ---
+
+@task('notify_claim')
+def notify_claim(payload):
+    # Fan out a new claim to the item owner: in-app notification, then email/SMS
+    claim = Claim.objects.select_related('item__user').filter(id=payload['claim_id']).first()
+    if claim is None or claim.item.user is None:
+        return
+    item = claim.item
+    owner = item.user
+    text = f"{claim.claimant_name or 'Someone'} has claimed your item: {item.title}"
+
+    # Keyed on the claim: a retry does not notify twice, two claims always do
+    Notification.objects.get_or_create(
+        dedup_key=f"claim:{claim.id}",
+        defaults={
+            'user': owner,
+            'item': item,
+            'type': 'claim',
+            'title': 'New Claim Received',
+            'message': text,
+        },
+    )
+    if owner.email_notifications and owner.email:
+        enqueue('send_email', {
+            'to': owner.email,
+            'subject': 'New Claim Received',
+            'body': text,
+        }, key=f"claim-email:{claim.id}")
+    if owner.sms_notifications and owner.phone:
+        enqueue('send_sms', {'to': owner.phone, 'body': text}, key=f"claim-sms:{claim.id}")
+
+
+@task('send_email', shared=get_connection)
+def send_email(payload, connection):
+    # The batch shares one backend connection (EMAIL_BACKEND decides transport)
+    message = EmailMessage(
+        payload['subject'], payload['body'], settings.DEFAULT_FROM_EMAIL, [payload['to']], connection=connection
+    )
+    if not connection.send_messages([message]):
+        raise RuntimeError(f"Email to {payload['to']} was not sent")
+
+
+@task('send_sms')
+def send_sms(payload):
+    # No SMS provider is configured yet; log the message like the console email backend
+    logger.info("SMS to %s: %s", payload['to'], payload['body'])
+
+
+@task('hash_item_image')
+def hash_item_image(payload):
+    # Perceptual hash of an uploaded photo for similar-image search
+    item = Item.objects.filter(id=payload['item_id']).only('id', 'image_path').first()
+    if item is not None:
+        imagehash.hash_item_image(item)
+
+
+@task('match_saved_searches')
+def match_saved_searches(payload):
+    # Notify users whose saved searches match a newly reported item
+    item = Item.objects.filter(id=payload['item_id']).first()
+    if item is not None:
+        saved_searches.match_item(item)
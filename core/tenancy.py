@@ -0,0 +1,131 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from .audit import trusted_proxy
+from .models import Organization
+
+# Multi-campus tenancy.
+# TenantMiddleware maps each request to an Organization: the HEADER value
+# (a slug), else the request host (Organization.domain), else DEFAULT. The
+# header is only read on requests from TRUSTED_PROXIES (a front proxy that
+# sets it per site), so clients cannot switch campus with it. The tenant is
+# kept on request.tenant and in a context variable for the length of the
+# request. Views narrow their querysets with scoped(); the tenant
+# leading indexes on items/claims/items_archive keep those queries inside
+# the campus's own rows. With TenantRouter in DATABASE_ROUTERS, a tenant
+# whose db_alias names a configured database has its queries sent there.
+# Organizations themselves always live in the 'default' database.
+
+TENANCY_SETTINGS = {
+    'ENABLED': False,
+    'HEADER': 'X-Tenant',
+    'DEFAULT': 'default',   # slug used when neither header nor host matches
+    'CACHE_SECONDS': 60,    # resolved tenants are kept in-process this long
+}
+TENANCY_SETTINGS.update(getattr(settings, 'TENANCY', {}))
+
+_current = ContextVar('tenant', default=None)
+
+# ('slug' | 'domain', value) -> (expires, Organization or None)
+_cache = {}
+
+
+def current_tenant():
+    return _current.get()
+
+
+@contextmanager
+def activate(tenant):
+    # Run a block (task, command, shell) as the given tenant
+    token = _current.set(tenant)
+    try:
+        yield tenant
+    finally:
+        _current.reset(token)
+
+
+def _lookup(field, value, now):
+    entry = _cache.get((field, value))
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    tenant = Organization.objects.using('default').filter(active=True, **{field: value}).first()
+    _cache[(field, value)] = (now + TENANCY_SETTINGS['CACHE_SECONDS'], tenant)
+    return tenant
+
+
+def resolve(request):
+    # Organization for the request, or None if nothing matches
+    now = time.monotonic()
+    slug = request.headers.get(TENANCY_SETTINGS['HEADER'])
+    if slug and trusted_proxy(request.META.get('REMOTE_ADDR')):
+        return _lookup('slug', slug.strip().lower(), now)
+    tenant = _lookup('domain', request.get_host().split(':')[0].lower(), now)
+    if tenant is None and TENANCY_SETTINGS['DEFAULT']:
+        tenant = _lookup('slug', TENANCY_SETTINGS['DEFAULT'], now)
+    return tenant
+
+
+def default_organization():
+    # The DEFAULT campus (cached), or None if it does not exist
+    return _lookup('slug', TENANCY_SETTINGS['DEFAULT'], time.monotonic())
+
+
+def organization_for(request):
+    # Organization new rows belong to: the request's tenant, else the default
+    # campus, so rows created while tenancy is off stay visible once it is on
+    tenant = getattr(request, 'tenant', None)
+    return tenant if tenant is not None else default_organization()
+
+
+def scoped(queryset, request):
+    # Restrict a queryset to the request's tenant (no-op with tenancy disabled)
+    tenant = getattr(request, 'tenant', None)
+    if tenant is None:
+        return queryset
+    return queryset.filter(organization=tenant)
+
+
+class TenantMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.tenant = None
+        if not TENANCY_SETTINGS['ENABLED']:
+            return self.get_response(request)
+        tenant = resolve(request)
+        if tenant is None:
+            return JsonResponse({'success': False, 'error': 'Unknown campus'}, status=404)
+        request.tenant = tenant
+        token = _current.set(tenant)
+        try:
+            return self.get_response(request)
+        finally:
+            _current.reset(token)
+
+
+class TenantRouter:
+    # Sends the active tenant's queries to its own database alias
+    def _alias(self, model):
+        if model is Organization:
+            return 'default'
+        tenant = _current.get()
+        if tenant is not None and tenant.db_alias in settings.DATABASES:
+            return tenant.db_alias
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._alias(model)
+
+    def db_for_write(self, model, **hints):
+        return self._alias(model)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Tenant rows point at their organization across databases
+        if isinstance(obj1, Organization) or isinstance(obj2, Organization):
+            return True
+        return None
@@ -1,3 +1,236 @@
-from django.test import TestCase
+import json
+import threading
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.utils import timezone
+
+from . import tasks
+from .models import User, Item, Task
+from .versioning import VersionConflict, versioned_update
+
+
+class ConcurrentWriteTests(TransactionTestCase):
+    # Stress the conditional UPDATE paths from several threads. Each thread
+    # uses its own database connection, as concurrent requests would, so the
+    # threaded tests need a test database that allows that (not in-memory SQLite).
+    THREADS = 8
+    ROUNDS = 25
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.item = Item.objects.create(
+            user=self.user, title='Blue umbrella', description='Left on the bus', status='lost',
+            category='other', location='Route 5', date='2026-01-01', posted_by='owner', contact='owner@example.com',
+        )
+
+    def run_threads(self, target):
+        errors = []
+
+        def worker(index):
+            try:
+                target(index)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    @skipUnlessDBFeature('test_db_allows_multiple_connections')
+    def test_versioned_updates_never_lose_a_write(self):
+        # Read-modify-write of the same row: every attempt either lands exactly
+        # once (version + 1) or is rejected; nothing is silently overwritten
+        results = {'ok': 0, 'conflict': 0}
+        lock = threading.Lock()
+
+        def edit(index):
+            for round_number in range(self.ROUNDS):
+                item = Item.objects.get(id=self.item.id)
+                item.location = f"thread {index} round {round_number}"
+                try:
+                    versioned_update(item, ['location'])
+                    outcome = 'ok'
+                except VersionConflict:
+                    outcome = 'conflict'
+                with lock:
+                    results[outcome] += 1
+
+        self.run_threads(edit)
+        item = Item.objects.get(id=self.item.id)
+        self.assertEqual(results['ok'] + results['conflict'], self.THREADS * self.ROUNDS)
+        self.assertEqual(item.version, 1 + results['ok'])
+
+    @skipUnlessDBFeature('test_db_allows_multiple_connections')
+    def test_view_counts_do_not_undo_recover(self):
+        # Page views race a recover; the F() increment must not write status back
+        client = Client()
+
+        def view_or_recover(index):
+            for round_number in range(self.ROUNDS):
+                if index == 0 and round_number == self.ROUNDS // 2:
+                    response = client.post(f'/api/items/{self.item.id}/recover', '{}', content_type='application/json')
+                    assert response.status_code == 200, response.content
+                else:
+                    response = client.get(f'/api/items/{self.item.id}')
+                    assert response.status_code == 200, response.content
+
+        self.run_threads(view_or_recover)
+        item = Item.objects.get(id=self.item.id)
+        self.assertEqual(item.status, 'recovered')
+        self.assertEqual(item.views, self.THREADS * self.ROUNDS - 1)
+        self.assertEqual(item.version, 2)
+
+    @skipUnlessDBFeature('test_db_allows_multiple_connections')
+    def test_concurrent_reposts_are_stored_once(self):
+        # The same report posted from several threads at once: the dedup check,
+        # create and index run under the reporter's lock, so one is stored
+        # and the rest merge into it
+        client = Client()
+        report = {
+            'itemName': 'Black leather wallet', 'category': 'wallet',
+            'description': 'Black leather wallet with a library card inside',
+            'location': 'Main library, second floor', 'dateLost': '2026-01-02',
+            'contactInfo': 'reporter@example.com',
+        }
+
+        def post(index):
+            response = client.post('/api/report-lost', report)
+            assert response.status_code == 200, response.content
+
+        self.run_threads(post)
+        self.assertEqual(Item.objects.filter(title='Black leather wallet').count(), 1)
+
+    def test_stale_version_is_rejected_with_409(self):
+        client = Client()
+        url = f'/api/users/{self.user.id}'
+        first = client.put(url, json.dumps({'bio': 'first', 'version': 1}), content_type='application/json')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()['version'], 2)
+
+        stale = client.put(url, json.dumps({'bio': 'second', 'version': 1}), content_type='application/json')
+        self.assertEqual(stale.status_code, 409)
+        self.assertEqual(stale.json()['version'], 2)
+        self.assertEqual(User.objects.get(id=self.user.id).bio, 'first')
+
+        recover = client.post(f'/api/items/{self.item.id}/recover', json.dumps({'version': 5}),
+                              content_type='application/json')
+        self.assertEqual(recover.status_code, 409)
+        self.assertEqual(Item.objects.get(id=self.item.id).status, 'lost')
+
+    def test_stale_admin_save_is_redisplayed(self):
+        admin_user = User.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        client = Client()
+        client.force_login(admin_user)
+        url = f'/admin/core/item/{self.item.id}/change/'
+        form = client.get(url).context['adminform'].form
+        data = {name: form[name].value() for name in form.fields}
+        data = {name: '' if value is None else value for name, value in data.items()}
+
+        # Someone else saves after the form was loaded
+        versioned_update(Item.objects.get(id=self.item.id), [])
+        data['title'] = 'Red umbrella'
+        response = client.post(url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'changed by someone else')
+        self.assertEqual(Item.objects.get(id=self.item.id).title, 'Blue umbrella')
+
+        data['version'] = 2
+        response = client.post(url, data)
+        self.assertEqual(response.status_code, 302)
+        item = Item.objects.get(id=self.item.id)
+        self.assertEqual((item.title, item.version), ('Red umbrella', 3))
+
+
+class DashboardTests(TestCase):
+    def test_owner_dashboard_is_five_queries(self):
+        # The session's user row, then one query per other section
+        user = User.objects.create_user(username='owner', email='owner@example.com', password='x')
+        client = Client()
+        client.force_login(user)
+        with self.assertNumQueries(5):
+            response = client.get(f'/api/users/{user.id}/dashboard')
+        self.assertEqual(response.json()['user']['id'], user.id)
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def flaky(self, payload):
+        self.calls.append(payload)
+        raise RuntimeError('provider down')
+
+    def test_enqueue_with_a_used_key_returns_the_existing_task(self):
+        first = tasks.enqueue('send_sms', {'to': '555', 'body': 'one'}, key='sms:1')
+        second = tasks.enqueue('send_sms', {'to': '555', 'body': 'two'}, key='sms:1')
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(Task.objects.filter(idempotency_key='sms:1').count(), 1)
+        self.assertEqual(Task.objects.get(id=first.id).payload['body'], 'one')
+
+    def test_failures_back_off_and_end_in_failed(self):
+        with mock.patch.dict(tasks._registry, {'flaky': (self.flaky, None)}):
+            queued = tasks.enqueue('flaky', {'n': 1}, max_attempts=2)
+            self.assertEqual(tasks.run_tasks(tasks.claim_batch()), (0, 1))
+            queued.refresh_from_db()
+            self.assertEqual((queued.status, queued.attempts), ('pending', 1))
+            backoff = timedelta(seconds=tasks.QUEUE_SETTINGS['RETRY_BACKOFF'])
+            self.assertGreater(queued.run_at, timezone.now() + backoff / 2)
+            self.assertIn('provider down', queued.last_error)
+
+            # Not due again until the backoff has passed
+            self.assertEqual(tasks.claim_batch(), [])
+            Task.objects.filter(id=queued.id).update(run_at=timezone.now() - timedelta(seconds=1))
+            with self.assertLogs('core.tasks', 'ERROR'):
+                self.assertEqual(tasks.run_tasks(tasks.claim_batch()), (0, 1))
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('failed', 2))
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(tasks.claim_batch(), [])
+
+    def test_running_task_is_reclaimed_after_visibility_timeout(self):
+        queued = tasks.enqueue('send_sms', {'to': '555', 'body': 'hi'})
+        self.assertEqual([t.id for t in tasks.claim_batch(worker='crashed')], [queued.id])
+        # Still locked by the first worker
+        self.assertEqual(tasks.claim_batch(worker='second'), [])
+
+        expired = timezone.now() - timedelta(seconds=tasks.QUEUE_SETTINGS['VISIBILITY_TIMEOUT'] + 1)
+        Task.objects.filter(id=queued.id).update(locked_at=expired)
+        reclaimed = tasks.claim_batch(worker='second')
+        self.assertEqual([t.id for t in reclaimed], [queued.id])
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.locked_by, queued.attempts), ('running', 'second', 1))
+        self.assertEqual(queued.last_error, tasks.LOST_ERROR)
+
+        self.assertEqual(tasks.run_tasks(reclaimed), (1, 0))
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('done', 2))
+
+    def test_send_email_delivers_through_the_backend(self):
+        tasks.enqueue('send_email', {'to': 'owner@example.com', 'subject': 'New Claim Received', 'body': 'Hello'})
+        tasks.enqueue('send_email', {'to': 'other@example.com', 'subject': 'New Claim Received', 'body': 'Hi'})
+        self.assertEqual(tasks.run_tasks(tasks.claim_batch()), (2, 0))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['other@example.com', 'owner@example.com'])
+        self.assertEqual(mail.outbox[0].subject, 'New Claim Received')
+
+    def test_purge_done_keeps_recent_and_failed_tasks(self):
+        old = timezone.now() - timedelta(days=tasks.QUEUE_SETTINGS['DONE_RETENTION_DAYS'] + 1)
+        done_old = tasks.enqueue('send_sms', {'to': '1', 'body': 'x'}, key='old')
+        done_new = tasks.enqueue('send_sms', {'to': '2', 'body': 'x'})
+        failed_old = tasks.enqueue('send_sms', {'to': '3', 'body': 'x'})
+        Task.objects.filter(id__in=[done_old.id, done_new.id]).update(status='done')
+        Task.objects.filter(id=failed_old.id).update(status='failed')
+        Task.objects.filter(id__in=[done_old.id, failed_old.id]).update(run_at=old, updated_at=old)
+
+        self.assertEqual(tasks.purge_done(), 1)
+        self.assertEqual(set(Task.objects.values_list('id', flat=True)), {done_new.id, failed_old.id})
+        # The purged task's key is free again
+        self.assertNotEqual(tasks.enqueue('send_sms', {'to': '1', 'body': 'x'}, key='old').id, done_old.id)
@@ -0,0 +1,143 @@
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+
+from .audit import client_ip
+
+# Request throttling.
+# Each rule is (key, rate) where key is 'ip' or 'user' and rate is
+# "<count>/<s|m|h|d>". A client gets 'count' tokens per period. The budget
+# is a counter in the shared cache (one key per client, rule and window);
+# each process leases tokens from it in small chunks with cache.incr and
+# spends them from a local dict, so most requests never touch the cache.
+# Once the shared budget is exhausted, the local entry remembers it and
+# rejects the rest of the window without another round trip.
+
+THROTTLE_SETTINGS = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'LEASE_SIZE': 10,  # max tokens a process takes from the shared budget at once
+    'LOCAL_MAX_KEYS': 50000,  # local entries kept before the dict is reset
+    'RULES': {},
+    'ROUTES': {},
+}
+THROTTLE_SETTINGS.update(getattr(settings, 'THROTTLE', {}))
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# (scope, key, ident, period) -> [window, tokens_left, exhausted]
+_local = {}
+
+
+def parse_rate(rate):
+    count, _, unit = rate.partition('/')
+    return int(count), PERIODS[unit[0]]
+
+
+def _identity(request, key):
+    if key == 'user':
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f"u{user.id}"
+    return f"ip{client_ip(request)}"
+
+
+def _lease(cache_key, limit, period, lease):
+    # Take up to 'lease' tokens from the shared budget; returns the number granted
+    cache = caches[THROTTLE_SETTINGS['CACHE']]
+    cache.add(cache_key, 0, timeout=period * 2)
+    try:
+        used = cache.incr(cache_key, lease)
+    except ValueError:
+        # Key evicted between add() and incr()
+        cache.set(cache_key, lease, timeout=period * 2)
+        used = lease
+    already = used - lease
+    return max(0, min(lease, limit - already))
+
+
+def consume(scope, key, ident, limit, period, now=None):
+    # Returns 0 when the request is allowed, else seconds until the window resets
+    now = now or time.time()
+    window = int(now // period)
+    retry_after = max(1, math.ceil((window + 1) * period - now))
+    local_key = (scope, key, ident, period)
+
+    entry = _local.get(local_key)
+    if entry is not None and entry[0] == window:
+        if entry[1] > 0:
+            entry[1] -= 1
+            return 0
+        if entry[2]:
+            return retry_after
+
+    lease = max(1, min(THROTTLE_SETTINGS['LEASE_SIZE'], limit // 10))
+    cache_key = f"throttle:{scope}:{key}:{ident}:{period}:{window}"
+    granted = _lease(cache_key, limit, period, lease)
+    if len(_local) >= THROTTLE_SETTINGS['LOCAL_MAX_KEYS']:
+        _local.clear()
+    if granted == 0:
+        _local[local_key] = [window, 0, True]
+        return retry_after
+    _local[local_key] = [window, granted - 1, False]
+    return 0
+
+
+def check(request, scope):
+    # Apply every rule of 'scope'; returns a 429 response or None
+    request._throttle_checked = True
+    if not THROTTLE_SETTINGS['ENABLED']:
+        return None
+    rules = THROTTLE_SETTINGS['RULES'].get(scope)
+    if not rules:
+        return None
+    wait = 0
+    for key, rate in rules:
+        limit, period = parse_rate(rate)
+        wait = max(wait, consume(scope, key, _identity(request, key), limit, period))
+    if wait:
+        response = JsonResponse({'success': False, 'error': 'Too many requests, please try again later'}, status=429)
+        response['Retry-After'] = str(wait)
+        return response
+    return None
+
+
+def throttle(scope):
+    # View decorator; also marks the view so ThrottleMiddleware uses this scope
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if not getattr(request, '_throttle_checked', False):
+                response = check(request, scope)
+                if response is not None:
+                    return response
+            return view_func(request, *args, **kwargs)
+        wrapped.throttle_scope = scope
+        return wrapped
+    return decorator
+
+
+class ThrottleMiddleware:
+    # Throttles API views by scope: the THROTTLE['ROUTES'] entry for the URL
+    # name, else the view's @throttle scope, else 'default' for /api/ paths.
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        scope = None
+        if request.resolver_match is not None:
+            scope = THROTTLE_SETTINGS['ROUTES'].get(request.resolver_match.url_name)
+        if scope is None:
+            scope = getattr(view_func, 'throttle_scope', None)
+        if scope is None and request.path.startswith('/api/'):
+            scope = 'default'
+        if scope is None:
+            return None
+        return check(request, scope)
@@ -0,0 +1,47 @@
+from django.db.models import F
+from django.utils import timezone
+
+# Optimistic concurrency for Item and User.
+# Both carry a 'version' column. A write is a single
+#   UPDATE ... SET <changed fields>, version = version + 1
+#   WHERE id = %s AND version = %s
+# so it only touches the fields the request changed and fails (instead of
+# silently overwriting) when someone else wrote the row in the meantime.
+# Views turn VersionConflict into a 409 response.
+
+
+class VersionConflict(Exception):
+    def __init__(self, current_version=None):
+        super().__init__('The record was changed by another request; reload and try again')
+        self.current_version = current_version
+
+
+def expected_version(request, data=None):
+    # Client's version from the JSON body or an If-Match header, else None
+    value = (data or {}).get('version', request.headers.get('If-Match', '').strip('"') or None)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def versioned_update(instance, fields, version=None):
+    # Write 'fields' of instance if its row is still at 'version' (default: the
+    # version loaded with the instance). Raises VersionConflict otherwise.
+    model = type(instance)
+    if version is None:
+        version = instance.version
+    values = {name: getattr(instance, name) for name in fields}
+    # update() bypasses auto_now; keep updated_at moving (delta sync depends on it)
+    for field in model._meta.concrete_fields:
+        if getattr(field, 'auto_now', False):
+            values[field.name] = timezone.now()
+            setattr(instance, field.name, values[field.name])
+    updated = model.objects.filter(pk=instance.pk, version=version).update(version=F('version') + 1, **values)
+    if not updated:
+        current = model.objects.filter(pk=instance.pk).values_list('version', flat=True).first()
+        raise VersionConflict(current)
+    instance.version = version + 1
+    return instance.version
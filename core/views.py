@@ -1,15 +1,19 @@
 import json
-import os
-from datetime import datetime
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponseNotAllowed
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.hashers import make_password
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from django.conf import settings
-from .models import User, Item, Claim, Notification, ActivityLog
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from .models import User, Item, Claim, ActivityLog, Message, ArchivedItem, SavedSearch
+from . import analytics, archive, audit, columnar, dashboard, dedup, imagehash, media, messaging, pagination, saved_searches, suggest, sync, tasks, tenancy, versioning
+from .audit import log_activity
+from .throttling import throttle
 
 # --- Page Views ---
 # Render HTML templates for the website pages.
@@ -48,11 +52,18 @@ def edit_profile(request):
 def about(request):
     return render(request, 'about.html')
 
+def media_file(request, filename):
+    # Uploaded photos: conditional/range requests or proxy hand-off (core/media.py)
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+    return media.serve(request, filename)
+
 # --- API Views ---
 # JSON endpoints called by frontend JavaScript.
 # These read/write data in MySQL via Django's ORM (models.py).
 
 @csrf_exempt
+@throttle('login')
 def api_login(request):
     if request.method == 'POST':
         try:
@@ -63,18 +74,12 @@ def api_login(request):
             if not email or not password:
                 return JsonResponse({'success': False, 'error': 'Email and password are required'}, status=400)
 
-            # Authenticate using Django's auth system
-            # Note: We use 'username' as the unique identifier in Django default auth, 
-            # but our User model might use email. 
-            # Let's try to find the user by email first.
-            try:
-                user_obj = User.objects.get(email=email)
-                user = authenticate(request, username=user_obj.username, password=password)
-            except User.DoesNotExist:
-                user = None
+            # Single indexed lookup on users.email (core/backends.py)
+            user = authenticate(request, email=email, password=password)
 
             if user is not None:
                 login(request, user)
+                log_activity('login', request, user=user)
                 
                 # Update last login is handled by Django automatically
                 
@@ -86,16 +91,19 @@ def api_login(request):
                         'email': user.email,
                         'phone': user.phone,
                         'location': user.location,
-                        'join_date': user.date_joined.isoformat()
+                        'join_date': user.date_joined.isoformat(),
+                        'version': user.version
                     }
                 })
             else:
+                log_activity('login_failed', request, details=email)
                 return JsonResponse({'success': False, 'error': 'Invalid email or password'}, status=401)
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)}, status=500)
     return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
 
 @csrf_exempt
+@throttle('register')
 def api_register(request):
     if request.method == 'POST':
         try:
@@ -124,8 +132,10 @@ def api_register(request):
                 password=password,
                 first_name=first_name,
                 last_name=last_name,
-                phone=phone
+                phone=phone,
+                organization=tenancy.organization_for(request)
             )
+            log_activity('register', request, user=user)
             
             return JsonResponse({
                 'success': True,
@@ -148,6 +158,27 @@ def get_category_emoji(category):
     }
     return emojis.get(category, '📦')
 
+def item_to_dict(item):
+    # Row format shared by the api_items list and delta responses
+    return {
+        'id': item.id,
+        'title': item.title,
+        'description': item.description,
+        'status': item.status,
+        'category': item.category,
+        'location': item.location,
+        'date': item.date,
+        'time': item.time,
+        'posted_by': item.posted_by,
+        'contact': item.contact,
+        'reward': item.reward,
+        'image_path': item.image_path,
+        'image': get_category_emoji(item.category),
+        'views': item.views,
+        'version': getattr(item, 'version', None), # ArchivedItem rows are read-only and unversioned
+        'date_reported': item.date_reported.isoformat()
+    }
+
 @csrf_exempt
 def api_items(request):
     if request.method == 'GET':
@@ -156,8 +187,36 @@ def api_items(request):
             category = request.GET.get('category')
             search = request.GET.get('search')
             user_id = request.GET.get('user_id')
+            sync_token = sync.new_token()
+            # ?format=columnar: arrays per field, see core/columnar.py
+            response_format = 'columnar' if request.GET.get('format') == 'columnar' else 'rows'
+
+            # Delta sync: only rows changed since the client's token, plus tombstones.
+            # status/category/search are not applied here; clients filter their cache.
+            updated_since = request.GET.get('updated_since')
+            if updated_since:
+                since = sync.parse_token(updated_since)
+                if since is None:
+                    return JsonResponse({'success': False, 'error': 'Invalid updated_since'}, status=400)
+                if since < sync.tombstone_horizon():
+                    return JsonResponse({'success': True, 'full_sync_required': True, 'sync_token': sync_token})
+
+                changed = tenancy.scoped(Item.objects.filter(updated_at__gt=since), request).order_by('updated_at', 'id')
+                if user_id:
+                    changed = changed.filter(user_id=user_id)
+                items_list = [item_to_dict(item) for item in changed]
+
+                return JsonResponse({
+                    'success': True,
+                    'format': response_format,
+                    'items': columnar.encode(items_list) if response_format == 'columnar' else items_list,
+                    'deleted': sync.deleted_since(since, user_id, getattr(request, 'tenant', None)),
+                    'count': len(items_list),
+                    'sync_token': sync_token,
+                    'full_sync_required': False
+                })
 
-            items = Item.objects.all().order_by('-date_reported')
+            items = tenancy.scoped(Item.objects.all(), request).order_by('-date_reported')
 
             if status:
                 items = items.filter(status=status)
@@ -168,30 +227,37 @@ def api_items(request):
             if search:
                 items = items.filter(title__icontains=search) | items.filter(description__icontains=search)
 
-            items_list = []
-            for item in items:
-                items_list.append({
-                    'id': item.id,
-                    'title': item.title,
-                    'description': item.description,
-                    'status': item.status,
-                    'category': item.category,
-                    'location': item.location,
-                    'date': item.date,
-                    'time': item.time,
-                    'posted_by': item.posted_by,
-                    'contact': item.contact,
-                    'reward': item.reward,
-                    'image_path': item.image_path,
-                    'image': get_category_emoji(item.category),
-                    'views': item.views,
-                    'date_reported': item.date_reported.isoformat()
-                })
+            # Archived items live in a separate table and are only read on request
+            include_archived = request.GET.get('include_archived') in ('1', 'true')
+            archived = ArchivedItem.objects.none()
+            if include_archived:
+                archived = tenancy.scoped(ArchivedItem.objects.all(), request).order_by('-date_reported')
+                if status:
+                    archived = archived.filter(status=status)
+                if category:
+                    archived = archived.filter(category=category)
+                if user_id:
+                    archived = archived.filter(user_id=user_id)
+                if search:
+                    archived = archived.filter(title__icontains=search) | archived.filter(description__icontains=search)
+
+            items_list = [item_to_dict(item) for item in items]
+
+            if include_archived:
+                for item in archived:
+                    row = item_to_dict(item)
+                    row['id'] = item.original_id
+                    row['archived'] = True
+                    items_list.append(row)
+                # Both sources are already newest-first; keep the merged list that way
+                items_list.sort(key=lambda row: row['date_reported'], reverse=True)
 
             return JsonResponse({
                 'success': True,
-                'items': items_list,
-                'count': len(items_list)
+                'format': response_format,
+                'items': columnar.encode(items_list) if response_format == 'columnar' else items_list,
+                'count': len(items_list),
+                'sync_token': sync_token
             })
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)}, status=500)
@@ -202,14 +268,21 @@ def api_items(request):
 def api_item_detail(request, item_id):
     if request.method == 'GET':
         try:
-            item = get_object_or_404(Item, id=item_id)
-            
-            # Increment view count
-            item.views += 1
-            item.save()
+            item = tenancy.scoped(Item.objects.all(), request).filter(id=item_id).first()
+            archived = item is None
+            if archived:
+                # Archived items are served read-only under their original id
+                item = tenancy.scoped(ArchivedItem.objects.all(), request).filter(original_id=item_id).first()
+                if item is None:
+                    return JsonResponse({'success': False, 'error': 'Item not found'}, status=404)
+            else:
+                # Atomic increment that leaves version/updated_at alone, so page
+                # views never conflict with (or undo) concurrent edits
+                Item.objects.filter(id=item.id).update(views=F('views') + 1)
+                item.views += 1
 
             item_dict = {
-                'id': item.id,
+                'id': item.original_id if archived else item.id,
                 'title': item.title,
                 'description': item.description,
                 'status': item.status,
@@ -224,8 +297,11 @@ def api_item_detail(request, item_id):
                 'image_path': item.image_path,
                 'image': get_category_emoji(item.category),
                 'views': item.views,
-                'user_id': item.user.id if item.user else None
+                'version': getattr(item, 'version', None),
+                'user_id': item.user_id
             }
+            if archived:
+                item_dict['archived'] = True
 
             return JsonResponse({
                 'success': True,
@@ -236,8 +312,9 @@ def api_item_detail(request, item_id):
             
     elif request.method == 'DELETE':
         try:
-            item = get_object_or_404(Item, id=item_id)
-            item.delete()
+            item = get_object_or_404(tenancy.scoped(Item.objects.all(), request), id=item_id)
+            log_activity('item_deleted', request, user=item.user, details=f"{item.id}: {item.title}")
+            archive.delete_items([item.id])
             return JsonResponse({'success': True, 'message': 'Item deleted successfully'})
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)}, status=500)
@@ -245,6 +322,7 @@ def api_item_detail(request, item_id):
     return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
 
 @csrf_exempt
+@throttle('report')
 def api_report_lost(request):
     if request.method == 'POST':
         try:
@@ -256,22 +334,6 @@ def api_report_lost(request):
                 if field not in data:
                     return JsonResponse({'success': False, 'error': f'Missing required field: {field}'}, status=400)
 
-            image_path = None
-            if 'itemImage' in request.FILES:
-                image = request.FILES['itemImage']
-                # Save image
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f"{timestamp}_{image.name}"
-                # Save to static/uploads
-                # Ensure directory exists
-                upload_dir = os.path.join(settings.BASE_DIR, 'findit_django', 'static', 'uploads')
-                os.makedirs(upload_dir, exist_ok=True)
-                
-                with open(os.path.join(upload_dir, filename), 'wb+') as destination:
-                    for chunk in image.chunks():
-                        destination.write(chunk)
-                image_path = filename
-
             user_id = data.get('user_id')
             user = None
             if user_id:
@@ -280,26 +342,62 @@ def api_report_lost(request):
                 except User.DoesNotExist:
                     pass
 
-            item = Item.objects.create(
-                user=user,
-                title=data['itemName'],
-                description=data['description'],
-                status='lost',
-                category=data['category'],
-                location=data['location'],
-                date=data['dateLost'],
-                time=data.get('timeLost', ''),
-                posted_by=data['contactInfo'].split('@')[0], # Simplified
-                contact=data['contactInfo'],
-                reward=data.get('reward', ''),
-                additional_info=data.get('additionalInfo', ''),
-                image_path=image_path
-            )
+            # Near-duplicate check (core/dedup.py), create and index under the
+            # reporter's lock, so concurrent re-posts see each other
+            with dedup.reporter_lock(user, data['contactInfo']):
+                fingerprint = None
+                if dedup.DEDUP_SETTINGS['ENABLED']:
+                    fingerprint = dedup.check_report(
+                        'lost', data['itemName'], data['description'], data['location'],
+                        user=user, contact=data['contactInfo'], organization=tenancy.organization_for(request)
+                    )
+                    if fingerprint.merge_into is not None:
+                        return JsonResponse({
+                            'success': True,
+                            'message': 'This item was already reported.',
+                            'item_id': fingerprint.merge_into.id,
+                            'merged': True
+                        })
+
+                image_path = None
+                if 'itemImage' in request.FILES:
+                    # Streamed to the uploads directory (core/media.py)
+                    image_path = media.save_upload(request.FILES['itemImage'])
+
+                # The analytics event commits with the item or not at all
+                item = Item.objects.create(
+                    user=user,
+                    title=data['itemName'],
+                    description=data['description'],
+                    status='lost',
+                    category=data['category'],
+                    location=data['location'],
+                    date=data['dateLost'],
+                    time=data.get('timeLost', ''),
+                    posted_by=data['contactInfo'].split('@')[0], # Simplified
+                    contact=data['contactInfo'],
+                    reward=data.get('reward', ''),
+                    additional_info=data.get('additionalInfo', ''),
+                    image_path=image_path,
+                    organization=tenancy.organization_for(request)
+                )
+                analytics.record('lost', item)
+
+                duplicate_of = None
+                if fingerprint is not None:
+                    duplicate_of = fingerprint.duplicate_of
+                    dedup.index_item(item, fingerprint.signature, fingerprint.buckets, duplicate_of, fingerprint.score)
+            log_activity('report_lost', request, user=user, item=item)
+
+            if image_path:
+                tasks.enqueue('hash_item_image', {'item_id': item.id}, key=f"image-hash:{item.id}")
+            tasks.enqueue('match_saved_searches', {'item_id': item.id}, key=f"saved-search:{item.id}")
 
             return JsonResponse({
                 'success': True,
                 'message': 'Lost item reported successfully!',
-                'item_id': item.id
+                'item_id': item.id,
+                'duplicate_of': duplicate_of
             })
 
         except Exception as e:
@@ -307,6 +405,7 @@ def api_report_lost(request):
     return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
 
 @csrf_exempt
+@throttle('report')
 def api_report_found(request):
     if request.method == 'POST':
         try:
@@ -317,19 +416,6 @@ def api_report_found(request):
                 if field not in data:
                     return JsonResponse({'success': False, 'error': f'Missing required field: {field}'}, status=400)
 
-            image_path = None
-            if 'itemImage' in request.FILES:
-                image = request.FILES['itemImage']
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f"{timestamp}_{image.name}"
-                upload_dir = os.path.join(settings.BASE_DIR, 'findit_django', 'static', 'uploads')
-                os.makedirs(upload_dir, exist_ok=True)
-                
-                with open(os.path.join(upload_dir, filename), 'wb+') as destination:
-                    for chunk in image.chunks():
-                        destination.write(chunk)
-                image_path = filename
-
             user_id = data.get('user_id')
             user = None
             if user_id:
@@ -338,26 +424,60 @@ def api_report_found(request):
                 except User.DoesNotExist:
                     pass
 
-            item = Item.objects.create(
-                user=user,
-                title=data['itemName'],
-                description=data['description'],
-                status='found',
-                category=data['category'],
-                location=data['location'],
-                date=data['dateFound'],
-                time=data.get('timeFound', ''),
-                posted_by=data['contactInfo'].split('@')[0],
-                contact=data['contactInfo'],
-                additional_info=data.get('additionalInfo', ''),
-                current_location=data.get('currentLocation', ''),
-                image_path=image_path
-            )
+            # Near-duplicate check (core/dedup.py), create and index under the
+            # reporter's lock, so concurrent re-posts see each other
+            with dedup.reporter_lock(user, data['contactInfo']):
+                fingerprint = None
+                if dedup.DEDUP_SETTINGS['ENABLED']:
+                    fingerprint = dedup.check_report(
+                        'found', data['itemName'], data['description'], data['location'],
+                        user=user, contact=data['contactInfo'], organization=tenancy.organization_for(request)
+                    )
+                    if fingerprint.merge_into is not None:
+                        return JsonResponse({
+                            'success': True,
+                            'message': 'This item was already reported.',
+                            'item_id': fingerprint.merge_into.id,
+                            'merged': True
+                        })
+
+                image_path = None
+                if 'itemImage' in request.FILES:
+                    image_path = media.save_upload(request.FILES['itemImage'])
+
+                item = Item.objects.create(
+                    user=user,
+                    title=data['itemName'],
+                    description=data['description'],
+                    status='found',
+                    category=data['category'],
+                    location=data['location'],
+                    date=data['dateFound'],
+                    time=data.get('timeFound', ''),
+                    posted_by=data['contactInfo'].split('@')[0],
+                    contact=data['contactInfo'],
+                    additional_info=data.get('additionalInfo', ''),
+                    current_location=data.get('currentLocation', ''),
+                    image_path=image_path,
+                    organization=tenancy.organization_for(request)
+                )
+                analytics.record('found', item)
+
+                duplicate_of = None
+                if fingerprint is not None:
+                    duplicate_of = fingerprint.duplicate_of
+                    dedup.index_item(item, fingerprint.signature, fingerprint.buckets, duplicate_of, fingerprint.score)
+            log_activity('report_found', request, user=user, item=item)
+
+            if image_path:
+                tasks.enqueue('hash_item_image', {'item_id': item.id}, key=f"image-hash:{item.id}")
+            tasks.enqueue('match_saved_searches', {'item_id': item.id}, key=f"saved-search:{item.id}")
 
             return JsonResponse({
                 'success': True,
                 'message': 'Found item reported successfully!',
-                'item_id': item.id
+                'item_id': item.id,
+                'duplicate_of': duplicate_of
             })
 
         except Exception as e:
@@ -365,12 +485,13 @@ def api_report_found(request):
     return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
 
 @csrf_exempt
+@throttle('claim')
 def api_claim(request, item_id):
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
             
-            item = get_object_or_404(Item, id=item_id)
+            item = get_object_or_404(tenancy.scoped(Item.objects.all(), request), id=item_id)
             
             claim = Claim.objects.create(
                 item=item,
@@ -378,18 +499,14 @@ def api_claim(request, item_id):
                 claimant_email=data.get('email', ''),
                 claimant_phone=data.get('phone', ''),
                 description=data.get('description', ''),
-                verification_details=data.get('verification', '')
+                verification_details=data.get('verification', ''),
+                organization=item.organization if item.organization_id else tenancy.organization_for(request)
             )
             
-            # Create notification for owner
-            if item.user:
-                Notification.objects.create(
-                    user=item.user,
-                    item=item,
-                    type='claim',
-                    title='New Claim Received',
-                    message=f"{data.get('name', 'Someone')} has claimed your item: {item.title}"
-                )
+            # Notify the owner off the request path (see core/tasks.py)
+            if item.user_id:
+                tasks.enqueue('notify_claim', {'claim_id': claim.id}, key=f"claim:{claim.id}")
+            log_activity('claim_submitted', request, item=item, details=f"claim {claim.id} by {claim.claimant_email}")
 
             return JsonResponse({
                 'success': True,
@@ -404,10 +521,19 @@ def api_claim(request, item_id):
 def api_recover(request, item_id):
     if request.method == 'POST':
         try:
-            item = get_object_or_404(Item, id=item_id)
+            data = json.loads(request.body) if request.body else {}
+            item = get_object_or_404(tenancy.scoped(Item.objects.all(), request), id=item_id)
+            newly_recovered = item.status != 'recovered'
             item.status = 'recovered'
-            item.save()
-            return JsonResponse({'success': True, 'message': 'Item marked as recovered'})
+            try:
+                with transaction.atomic():
+                    versioning.versioned_update(item, ['status'], versioning.expected_version(request, data))
+                    if newly_recovered:
+                        analytics.record('recovered', item)
+            except versioning.VersionConflict as e:
+                return JsonResponse({'success': False, 'error': str(e), 'version': e.current_version}, status=409)
+            log_activity('item_recovered', request, user=item.user, item=item)
+            return JsonResponse({'success': True, 'message': 'Item marked as recovered', 'version': item.version})
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)}, status=500)
     return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
@@ -418,24 +544,45 @@ def api_user_stats(request, user_id):
         try:
             user = get_object_or_404(User, id=user_id)
             
-            total = Item.objects.filter(user=user).count()
-            lost = Item.objects.filter(user=user, status='lost').count()
-            found = Item.objects.filter(user=user, status='found').count()
-            recovered = Item.objects.filter(user=user, status='recovered').count()
-            
             return JsonResponse({
                 'success': True,
-                'stats': {
-                    'total': total,
-                    'lost': lost,
-                    'found': found,
-                    'recovered': recovered
-                }
+                'stats': dashboard.item_stats(user)
             })
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)}, status=500)
     return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
 
+@csrf_exempt
+def api_user_dashboard(request, user_id):
+    if request.method == 'GET':
+        try:
+            try:
+                include = dashboard.parse_include(request.GET.get('include'))
+            except ValueError as e:
+                return JsonResponse({'success': False, 'error': str(e)}, status=400)
+            # Claims carry claimants' contact details: owner or staff only
+            denied = session_user_error(request, user_id, allow_staff=True)
+            if denied:
+                return denied
+            limit = dashboard.section_limit(request.GET.get('limit'))
+            # The owner's row is already loaded by the session; only staff
+            # viewing someone else's dashboard need it fetched
+            user = request.user
+            if str(user.id) != str(user_id):
+                user = User.objects.filter(id=user_id).first()
+                if user is None:
+                    return JsonResponse({'success': False, 'error': 'User not found'}, status=404)
+
+            # At most one query per section, see core/dashboard.py
+            data = dashboard.build(user, include, limit)
+            if 'items' in data:
+                data['items'] = [item_to_dict(item) for item in data['items']]
+
+            return JsonResponse({'success': True, **data})
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
 @csrf_exempt
 def api_update_profile(request, user_id):
     if request.method == 'PUT':
@@ -443,24 +590,401 @@ def api_update_profile(request, user_id):
             data = json.loads(request.body)
             user = get_object_or_404(User, id=user_id)
             
-            user.first_name = data.get('name', user.first_name) # Assuming name is mapped to first_name
-            user.phone = data.get('phone', user.phone)
-            user.location = data.get('location', user.location)
-            user.bio = data.get('bio', user.bio)
-            
             notifications = data.get('notifications', {})
-            user.email_notifications = notifications.get('email', user.email_notifications)
-            user.sms_notifications = notifications.get('sms', user.sms_notifications)
-            
             privacy = data.get('privacy', {})
-            user.profile_visibility = privacy.get('visibility', user.profile_visibility)
-            user.show_phone = privacy.get('showPhone', user.show_phone)
+            values = {
+                'first_name': data.get('name', user.first_name), # Assuming name is mapped to first_name
+                'phone': data.get('phone', user.phone),
+                'location': data.get('location', user.location),
+                'bio': data.get('bio', user.bio),
+                'email_notifications': notifications.get('email', user.email_notifications),
+                'sms_notifications': notifications.get('sms', user.sms_notifications),
+                'profile_visibility': privacy.get('visibility', user.profile_visibility),
+                'show_phone': privacy.get('showPhone', user.show_phone),
+            }
             
-            user.save()
+            # Write only the changed columns, and only if nobody else saved in between
+            changed = [name for name, value in values.items() if getattr(user, name) != value]
+            for name in changed:
+                setattr(user, name, values[name])
+            if changed:
+                try:
+                    versioning.versioned_update(user, changed, versioning.expected_version(request, data))
+                except versioning.VersionConflict as e:
+                    return JsonResponse({'success': False, 'error': str(e), 'version': e.current_version}, status=409)
             
             return JsonResponse({
                 'success': True,
-                'message': 'Profile updated successfully'
+                'message': 'Profile updated successfully',
+                'version': user.version
+            })
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+@csrf_exempt
+def api_similar_images(request, item_id):
+    if request.method == 'GET':
+        try:
+            item = get_object_or_404(tenancy.scoped(Item.objects.all(), request), id=item_id)
+            if item.image_hash is None:
+                return JsonResponse({'success': True, 'items': [], 'count': 0})
+
+            max_distance = imagehash.IMAGE_INDEX_SETTINGS['MAX_DISTANCE']
+            try:
+                distance = min(int(request.GET.get('distance', max_distance)), max_distance)
+            except ValueError:
+                distance = max_distance
+            limit = pagination.page_size(request.GET.get('limit'))
+
+            # The index covers every campus; only this campus's matches are returned
+            matches = imagehash.index.similar(item.image_hash, distance, exclude=item.id)
+            found = tenancy.scoped(Item.objects.all(), request).in_bulk([item_id for _, item_id in matches])
+
+            items_list = []
+            for distance, match_id in matches:
+                match = found.get(match_id)
+                if match is None:
+                    continue
+                if len(items_list) == limit:
+                    break
+                items_list.append({
+                    'id': match.id,
+                    'title': match.title,
+                    'status': match.status,
+                    'category': match.category,
+                    'location': match.location,
+                    'date': match.date,
+                    'image_path': match.image_path,
+                    'image': get_category_emoji(match.category),
+                    'distance': distance
+                })
+
+            return JsonResponse({
+                'success': True,
+                'items': items_list,
+                'count': len(items_list)
+            })
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+@csrf_exempt
+def api_suggest(request):
+    if request.method == 'GET':
+        try:
+            if not suggest.SUGGEST_SETTINGS['ENABLED']:
+                return JsonResponse({'success': True, 'suggestions': []})
+
+            kinds = request.GET.get('kinds')
+            kinds = tuple(k for k in suggest.KINDS if k in kinds.split(',')) if kinds else suggest.KINDS
+            try:
+                limit = max(1, min(int(request.GET.get('limit', suggest.DEFAULT_LIMIT)), suggest.MAX_LIMIT))
+            except ValueError:
+                limit = suggest.DEFAULT_LIMIT
+
+            # Served from the in-process index, see core/suggest.py
+            return JsonResponse({
+                'success': True,
+                'suggestions': suggest.index.suggest(request.GET.get('q', ''), kinds, limit, organization=getattr(request, 'tenant', None))
+            })
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+@csrf_exempt
+def api_user_saved_searches(request, user_id):
+    # Saved searches are private to their owner
+    denied = session_user_error(request, user_id)
+    if denied:
+        return denied
+    if request.method == 'GET':
+        try:
+            searches = SavedSearch.objects.filter(user=request.user, active=True).order_by('-id')
+            return JsonResponse({
+                'success': True,
+                'saved_searches': [saved_searches.search_to_dict(s) for s in searches]
+            })
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            name = (data.get('name') or '').strip()
+            if not name:
+                return JsonResponse({'success': False, 'error': 'name is required'}, status=400)
+            try:
+                search = saved_searches.save_search(
+                    request.user,
+                    name,
+                    status=data.get('status'),
+                    category=data.get('category'),
+                    keywords=data.get('keywords'),
+                    location=data.get('location'),
+                )
+            except ValueError as e:
+                return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+            return JsonResponse({'success': True, 'saved_search': saved_searches.search_to_dict(search)})
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+@csrf_exempt
+def api_saved_search_detail(request, search_id):
+    if request.method == 'DELETE':
+        try:
+            denied = session_user_error(request)
+            if denied:
+                return denied
+            # Other users' searches look the same as missing ones
+            search = SavedSearch.objects.filter(id=search_id, user=request.user).first()
+            if search is None:
+                return JsonResponse({'success': False, 'error': 'Saved search not found'}, status=404)
+            search.delete()
+            return JsonResponse({'success': True})
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+# --- Messaging API ---
+# Inbox, outbox and conversation threads. Pages are keyset-paginated
+# (?before=<message id> or ?cursor=<token>) so deep pages cost the same as
+# the first one. The caller is the logged-in session user; ids in the URL
+# or body must match it.
+
+def session_user_error(request, user_id=None, allow_staff=False):
+    # 401/403 response unless the session user is user_id (or staff, if allowed)
+    if not request.user.is_authenticated:
+        return JsonResponse({'success': False, 'error': 'Login required'}, status=401)
+    if user_id is not None and str(request.user.id) != str(user_id):
+        if not (allow_staff and request.user.is_staff):
+            return JsonResponse({'success': False, 'error': 'Not allowed'}, status=403)
+    # Accounts belong to one campus and are not usable from another campus's host
+    tenant = getattr(request, 'tenant', None)
+    if tenant is not None and request.user.organization_id != tenant.id and not request.user.is_staff:
+        return JsonResponse({'success': False, 'error': 'Not allowed'}, status=403)
+    return None
+
+@csrf_exempt
+@throttle('message')
+def api_send_message(request):
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            denied = session_user_error(request, data.get('sender_id'))
+            if denied:
+                return denied
+            body = data.get('message')
+            if not data.get('item_id') or not body:
+                return JsonResponse({'success': False, 'error': 'item_id and message are required'}, status=400)
+
+            item = get_object_or_404(tenancy.scoped(Item.objects.all(), request), id=data['item_id'])
+            sender = request.user
+
+            # Default receiver is the item owner
+            receiver_id = data.get('receiver_id') or item.user_id
+            if not receiver_id:
+                return JsonResponse({'success': False, 'error': 'Item has no owner to message'}, status=400)
+            receiver = get_object_or_404(User, id=receiver_id)
+            if receiver.id == sender.id:
+                return JsonResponse({'success': False, 'error': 'Cannot message yourself'}, status=400)
+
+            message = messaging.send_message(item, sender, receiver, body, subject=data.get('subject'))
+
+            return JsonResponse({
+                'success': True,
+                'message': messaging.message_to_dict(message)
+            })
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+@csrf_exempt
+def api_user_conversations(request, user_id):
+    if request.method == 'GET':
+        try:
+            denied = session_user_error(request, user_id)
+            if denied:
+                return denied
+            user = request.user
+            limit = pagination.page_size(request.GET.get('limit'))
+            try:
+                entries, next_cursor = messaging.inbox_page(user, request.GET.get('cursor'), limit)
+            except ValueError as e:
+                return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+            conversations = []
+            for entry in entries:
+                conversation = entry.conversation
+                last = conversation.last_message
+                conversations.append({
+                    'id': conversation.id,
+                    'item_id': conversation.item_id,
+                    'item_title': conversation.item.title,
+                    'peer': {
+                        'id': entry.peer.id,
+                        'name': f"{entry.peer.first_name} {entry.peer.last_name}".strip() or entry.peer.username,
+                        'email': entry.peer.email,
+                    },
+                    'unread_count': entry.unread_count,
+                    'last_message': messaging.message_to_dict(last) if last else None,
+                    'last_message_at': entry.last_message_at.isoformat() if entry.last_message_at else None,
+                })
+
+            return JsonResponse({
+                'success': True,
+                'conversations': conversations,
+                'unread_total': user.unread_messages,
+                'next_cursor': next_cursor
+            })
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+@csrf_exempt
+def api_user_messages(request, user_id):
+    if request.method == 'GET':
+        try:
+            denied = session_user_error(request, user_id)
+            if denied:
+                return denied
+            user = request.user
+            box = request.GET.get('box', 'inbox')
+            if box == 'inbox':
+                queryset = Message.objects.filter(receiver=user)
+            elif box == 'outbox':
+                queryset = Message.objects.filter(sender=user)
+            else:
+                return JsonResponse({'success': False, 'error': 'box must be inbox or outbox'}, status=400)
+
+            try:
+                before = pagination.parse_before(request.GET.get('before'))
+            except ValueError as e:
+                return JsonResponse({'success': False, 'error': str(e)}, status=400)
+            limit = pagination.page_size(request.GET.get('limit'))
+            messages, next_before = pagination.keyset_page(queryset, before, limit)
+
+            return JsonResponse({
+                'success': True,
+                'messages': [messaging.message_to_dict(m) for m in messages],
+                'unread_total': user.unread_messages,
+                'next_before': next_before
+            })
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+@csrf_exempt
+def api_conversation_messages(request, conversation_id):
+    if request.method == 'GET':
+        try:
+            denied = session_user_error(request)
+            if denied:
+                return denied
+            conversation = messaging.conversation_for(conversation_id, request.user)
+            if conversation is None:
+                return JsonResponse({'success': False, 'error': 'Conversation not found'}, status=404)
+            try:
+                before = pagination.parse_before(request.GET.get('before'))
+            except ValueError as e:
+                return JsonResponse({'success': False, 'error': str(e)}, status=400)
+            limit = pagination.page_size(request.GET.get('limit'))
+            messages, next_before = pagination.keyset_page(conversation.messages.all(), before, limit)
+
+            return JsonResponse({
+                'success': True,
+                'conversation_id': conversation.id,
+                'item_id': conversation.item_id,
+                'messages': [messaging.message_to_dict(m) for m in messages],
+                'next_before': next_before
+            })
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+@csrf_exempt
+def api_conversation_read(request, conversation_id):
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body) if request.body else {}
+            denied = session_user_error(request, data.get('user_id'))
+            if denied:
+                return denied
+            conversation = messaging.conversation_for(conversation_id, request.user)
+            if conversation is None:
+                return JsonResponse({'success': False, 'error': 'Conversation not found'}, status=404)
+            cleared = messaging.mark_conversation_read(conversation, request.user)
+            return JsonResponse({'success': True, 'cleared': cleared})
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+# --- Analytics API ---
+
+@csrf_exempt
+def api_stats_overview(request):
+    if request.method == 'GET':
+        try:
+            period = request.GET.get('period', 'day')
+            if period not in ('hour', 'day'):
+                return JsonResponse({'success': False, 'error': 'period must be hour or day'}, status=400)
+            max_days = analytics.ANALYTICS_SETTINGS['MAX_HOURLY_DAYS' if period == 'hour' else 'MAX_DAYS']
+            try:
+                days = max(1, min(int(request.GET.get('days', 30)), max_days))
+            except ValueError:
+                days = 30
+
+            # Served from item_stat_rollups (see core/analytics.py), cached briefly per campus
+            tenant = getattr(request, 'tenant', None)
+            data = cache.get_or_set(
+                f"stats-overview:{tenant.id if tenant else 'all'}:{period}:{days}",
+                lambda: analytics.overview(days, period, tenant),
+                analytics.ANALYTICS_SETTINGS['CACHE_SECONDS'],
+            )
+            return JsonResponse({'success': True, **data})
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+# --- Admin Audit API ---
+
+@csrf_exempt
+def api_admin_activity(request):
+    if request.method == 'GET':
+        try:
+            if not request.user.is_authenticated or not request.user.is_staff:
+                return JsonResponse({'success': False, 'error': 'Admin access required'}, status=403)
+
+            # Each filter is backed by an (column, -id) index
+            entries = ActivityLog.objects.all()
+            if request.GET.get('user_id'):
+                entries = entries.filter(user_id=request.GET['user_id'])
+            if request.GET.get('item_id'):
+                entries = entries.filter(item_id=request.GET['item_id'])
+            if request.GET.get('action'):
+                entries = entries.filter(action=request.GET['action'])
+
+            try:
+                before = pagination.parse_before(request.GET.get('before'))
+            except ValueError as e:
+                return JsonResponse({'success': False, 'error': str(e)}, status=400)
+            limit = pagination.page_size(request.GET.get('limit'))
+            entries, next_before = pagination.keyset_page(entries, before, limit)
+
+            return JsonResponse({
+                'success': True,
+                'activity': [{
+                    'id': entry.id,
+                    'user_id': entry.user_id,
+                    'item_id': entry.item_id,
+                    'action': entry.action,
+                    'details': entry.details,
+                    'ip_address': entry.ip_address,
+                    'created_at': entry.created_at.isoformat()
+                } for entry in entries],
+                'next_before': next_before,
+                'writer': audit.buffer.stats()
             })
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)}, status=500)
@@ -37,10 +37,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.compression.CompressionMiddleware', # gzip/brotli above RESPONSE_COMPRESSION['MIN_SIZE']
+    'core.tenancy.TenantMiddleware', # Sets request.tenant; see TENANCY below
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.throttling.ThrottleMiddleware', # Needs request.user; see THROTTLE below
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -87,6 +90,36 @@ DATABASES = {
     }
 }
 
+# Campuses with their own database: add the alias here, set
+# Organization.db_alias to it and enable the router.
+# DATABASE_ROUTERS = ['core.tenancy.TenantRouter']
+
+
+# Authentication
+# Users log in with their email address (unique index on users.email).
+
+AUTHENTICATION_BACKENDS = [
+    'core.backends.EmailBackend',
+]
+
+# The first hasher is used for new hashes; the others only verify old ones.
+# Passwords hashed with a different hasher or iteration count are
+# re-hashed transparently on the next successful login.
+# PASSWORD_PBKDF2_ITERATIONS can raise the work factor above Django's
+# default; it is never lowered below it.
+
+PASSWORD_HASHERS = [
+    'core.hashers.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+
+# Sessions
+# Session reads come from the cache and fall back to the database.
+# Needs a shared cache (Redis/Memcached) when running several processes.
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 
 # Password validation
 # Built-in auth validators
@@ -127,3 +160,162 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
+
+
+# Uploaded photos, served by core.views.media_file at /uploads/<name>
+# In production let the proxy send the bytes, e.g. nginx:
+#   MEDIA = {'ACCEL': 'x-accel-redirect'} with
+#   location /protected-uploads/ { internal; alias <ROOT>/; }
+
+MEDIA = {
+    'ROOT': BASE_DIR / 'findit_django' / 'static' / 'uploads',
+    'ACCEL': None,
+}
+
+
+# Email
+# Outgoing mail is sent by the background worker (python manage.py run_tasks).
+# Console backend for development; use smtp.EmailBackend in production.
+
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'FindIt <noreply@findit.local>'
+
+
+# Background task queue (core/tasks.py)
+
+TASK_QUEUE = {
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 30,
+    'VISIBILITY_TIMEOUT': 300,
+    'DONE_RETENTION_DAYS': 30,
+    'EAGER': False,
+}
+
+
+# Audit log (core/audit.py)
+# ActivityLog rows are buffered in memory and bulk-inserted by a background thread.
+
+AUDIT_LOG = {
+    'ENABLED': True,
+    'FLUSH_SIZE': 100,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_BUFFER': 10000,
+    'SYNC': False,
+}
+
+
+# Rate limiting (core/throttling.py)
+# Rules per scope: (key, rate) with key 'ip' or 'user' and rate '<n>/<s|m|h|d>'.
+# Budgets live in CACHES['default']; use a shared backend (Redis/Memcached)
+# when running more than one process, or each process gets its own budget.
+
+THROTTLE = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'LEASE_SIZE': 10,
+    'RULES': {
+        'default': [('ip', '300/m')],
+        'login': [('ip', '10/m'), ('ip', '100/h')],
+        'register': [('ip', '5/h')],
+        'report': [('ip', '30/h'), ('user', '30/h')],
+        'claim': [('ip', '30/h')],
+        'message': [('user', '60/m')],
+    },
+    # URL name -> scope, overrides the view's @throttle scope
+    'ROUTES': {},
+}
+
+# Reverse proxies in front of the app (addresses or networks). Only requests
+# arriving from one of these have their X-Forwarded-For header read for the
+# client address used by throttling and the audit log.
+TRUSTED_PROXIES = []
+
+
+# Duplicate report detection (core/dedup.py)
+# Similarities are estimated Jaccard scores of title/description/location shingles.
+
+DEDUP = {
+    'ENABLED': True,
+    'THRESHOLD': 0.7,
+    'MERGE_THRESHOLD': 0.95,
+    'MERGE_WINDOW_HOURS': 24,
+}
+
+
+# Similar-image search (core/imagehash.py, requires Pillow)
+
+IMAGE_INDEX = {
+    'MAX_DISTANCE': 10,
+    'REFRESH_SECONDS': 60,
+}
+
+
+# Typeahead for titles, locations and categories (core/suggest.py)
+
+SUGGEST = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 1000000,  # terms + items + item term references
+    'REFRESH_SECONDS': 300,
+}
+
+
+# Saved-search notifications for new items (core/saved_searches.py)
+
+SAVED_SEARCHES = {
+    'ENABLED': True,
+    'MAX_PER_USER': 20,
+    'MAX_NOTIFIED': 5000,  # users notified about one new item
+}
+
+
+# Reporting rollups built from item report/recovery events (core/analytics.py)
+# Run 'python manage.py rollup_stats' every few minutes.
+
+ANALYTICS = {
+    'SETTLE_SECONDS': 60,
+    'CACHE_SECONDS': 300,
+    'TOP_LOCATIONS': 10,
+}
+
+
+# Delta sync for cached item lists (core/sync.py)
+
+ITEM_SYNC = {
+    'OVERLAP_SECONDS': 5,
+    'TOMBSTONE_DAYS': 30,
+}
+
+
+# Response compression (core/compression.py)
+# Brotli is used when the optional 'brotli' package is installed.
+
+RESPONSE_COMPRESSION = {
+    'MIN_SIZE': 1024,
+    'BROTLI_QUALITY': 5,
+    'GZIP_MAX_RANDOM_BYTES': 100,
+}
+
+
+# Multi-campus tenancy (core/tenancy.py)
+# The campus comes from the X-Tenant header (organization slug, honoured only
+# from TRUSTED_PROXIES), else the request host (Organization.domain), else DEFAULT.
+
+TENANCY = {
+    'ENABLED': False,
+    'HEADER': 'X-Tenant',
+    'DEFAULT': 'default',
+    'CACHE_SECONDS': 60,
+}
+
+
+# Worker startup (core/startup.py)
+# PRELOAD warms the ORM, URL resolver and Jinja2 templates when wsgi.py is
+# imported, i.e. in the gunicorn master with --preload. The slim profile is
+# findit_django/settings_production.py.
+
+STARTUP = {
+    'PRELOAD': False,
+    'WARM_INDEXES': False,
+    'FREEZE_GC': True,
+}
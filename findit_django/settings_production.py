@@ -0,0 +1,34 @@
+"""
+Production profile for the prefork app servers.
+
+DJANGO_SETTINGS_MODULE=findit_django.settings_production
+gunicorn findit_django.wsgi --preload --workers 4
+
+Same as settings.py, without the parts API/page workers never use: the
+admin and messages apps (run the admin from a separate process on the
+default settings) and the DjangoTemplates backend (pages are Jinja2).
+Workers are warmed before forking; see core/startup.py.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+# Add each campus host name (Organization.domain)
+ALLOWED_HOSTS = ['localhost', '127.0.0.1']
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in (
+    'django.contrib.admin',
+    'django.contrib.messages',
+)]
+
+MIDDLEWARE = [m for m in MIDDLEWARE if m != 'django.contrib.messages.middleware.MessageMiddleware']
+
+# Jinja2 only; without DEBUG it caches compiled templates and skips the mtime checks
+TEMPLATES = [engine for engine in TEMPLATES if engine['BACKEND'].endswith('jinja2.Jinja2')]
+
+STARTUP = {
+    'PRELOAD': True,
+    'WARM_INDEXES': False,
+    'FREEZE_GC': True,
+}
@@ -1,4 +1,3 @@
-from django.contrib import admin
 from django.urls import path
 from django.conf import settings
 from django.conf.urls.static import static
@@ -8,8 +7,6 @@ from core import views
 # - Page Routes: render templates for user-facing pages
 # - API Routes: JSON endpoints consumed by frontend JS
 urlpatterns = [
-    path('admin/', admin.site.urls),
-    
     # Page Routes
     path('', views.index, name='index'),
     path('index.html', views.index, name='index_html'),
@@ -23,6 +20,7 @@ urlpatterns = [
     path('my-items.html', views.my_items, name='my_items'),
     path('edit-profile.html', views.edit_profile, name='edit_profile'),
     path('about.html', views.about, name='about'),
+    path('uploads/<path:filename>', views.media_file, name='media_file'),
 
     # API Routes
     path('api/login', views.api_login, name='api_login'),
@@ -33,11 +31,25 @@ urlpatterns = [
     path('api/report-found', views.api_report_found, name='api_report_found'),
     path('api/items/<int:item_id>/claim', views.api_claim, name='api_claim'),
     path('api/items/<int:item_id>/recover', views.api_recover, name='api_recover'),
+    path('api/items/<int:item_id>/similar-images', views.api_similar_images, name='api_similar_images'),
+    path('api/suggest', views.api_suggest, name='api_suggest'),
     path('api/users/<int:user_id>/stats', views.api_user_stats, name='api_user_stats'),
+    path('api/users/<int:user_id>/dashboard', views.api_user_dashboard, name='api_user_dashboard'),
+    path('api/users/<int:user_id>/saved-searches', views.api_user_saved_searches, name='api_user_saved_searches'),
+    path('api/saved-searches/<int:search_id>', views.api_saved_search_detail, name='api_saved_search_detail'),
     path('api/users/<int:user_id>', views.api_update_profile, name='api_update_profile'),
+    path('api/users/<int:user_id>/conversations', views.api_user_conversations, name='api_user_conversations'),
+    path('api/users/<int:user_id>/messages', views.api_user_messages, name='api_user_messages'),
+    path('api/messages', views.api_send_message, name='api_send_message'),
+    path('api/conversations/<int:conversation_id>/messages', views.api_conversation_messages, name='api_conversation_messages'),
+    path('api/conversations/<int:conversation_id>/read', views.api_conversation_read, name='api_conversation_read'),
+    path('api/stats/overview', views.api_stats_overview, name='api_stats_overview'),
+    path('api/admin/activity', views.api_admin_activity, name='api_admin_activity'),
 
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
-# Serve uploaded files in development
-if settings.DEBUG:
-    urlpatterns += static('/uploads/', document_root=settings.BASE_DIR / 'findit_django/static/uploads')
+# The slim production profile leaves the admin out (findit_django/settings_production.py)
+if 'django.contrib.admin' in settings.INSTALLED_APPS:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
@@ -11,3 +11,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'findit_django.settings')
 
 application = get_wsgi_application()
+
+# Warm caches before gunicorn --preload forks the workers (core/startup.py)
+from core import startup  # noqa: E402
+
+if startup.STARTUP_SETTINGS['PRELOAD']:
+    startup.preload()
+elif startup.STARTUP_SETTINGS['WARM_INDEXES']:
+    startup.start_indexes()
@@ -6,6 +6,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'findit_django.settings')
 django.setup()
 
 from core.models import User, Item, Category
+from core.tenancy import default_organization
 
 def seed():
     # Insert reference categories and demo records using Django ORM.
@@ -20,9 +21,14 @@ def seed():
         ('other', '📦', 'Other items not listed in categories')
     ]
     
+    # Sample data belongs to the default campus (created by migration 0015)
+    organization = default_organization()
+
     print("Creating categories...")
     for name, emoji, desc in categories:
-        Category.objects.get_or_create(name=name, defaults={'emoji': emoji, 'description': desc})
+        Category.objects.get_or_create(
+            organization=organization, name=name, defaults={'emoji': emoji, 'description': desc}
+        )
 
     # Create Sample User
     if not User.objects.filter(email='john@example.com').exists():
@@ -33,7 +39,8 @@ def seed():
             password='password123',
             first_name='John',
             last_name='Doe',
-            phone='1234567890'
+            phone='1234567890',
+            organization=organization
         )
     else:
         user = User.objects.get(email='john@example.com')
@@ -96,7 +103,8 @@ def seed():
                 'posted_by': item_data['posted_by'],
                 'contact': item_data['contact'],
                 'reward': item_data['reward'],
-                'image_path': item_data['image_path']
+                'image_path': item_data['image_path'],
+                'organization': organization
             }
         )
     
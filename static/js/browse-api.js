@@ -14,6 +14,7 @@ const categoryFilter = document.getElementById('category-filter');
 const locationFilter = document.getElementById('location-filter');
 const sortSelect = document.getElementById('sort-select');
 const clearFiltersBtn = document.getElementById('clear-filters');
+const saveSearchBtn = document.getElementById('save-search');
 const loadMoreBtn = document.getElementById('load-more-btn');
 const resultsCount = document.getElementById('results-count');
 
@@ -26,11 +27,14 @@ document.addEventListener('DOMContentLoaded', () => {
 // Event Listeners
 function setupEventListeners() {
     if (searchInput) searchInput.addEventListener('input', debounce(applyFilters, 300));
+    if (searchInput) searchInput.addEventListener('input', debounce(() => loadSuggestions(searchInput, 'search-suggestions', 'title,category'), 150));
     if (statusFilter) statusFilter.addEventListener('change', applyFilters);
     if (categoryFilter) categoryFilter.addEventListener('change', applyFilters);
     if (locationFilter) locationFilter.addEventListener('input', debounce(applyFilters, 300));
+    if (locationFilter) locationFilter.addEventListener('input', debounce(() => loadSuggestions(locationFilter, 'location-suggestions', 'location'), 150));
     if (sortSelect) sortSelect.addEventListener('change', applyFilters);
     if (clearFiltersBtn) clearFiltersBtn.addEventListener('click', clearAllFilters);
+    if (saveSearchBtn) saveSearchBtn.addEventListener('click', saveCurrentSearch);
     if (loadMoreBtn) loadMoreBtn.addEventListener('click', loadMoreItems);
 }
 
@@ -39,21 +43,40 @@ async function loadItems() {
     try {
         showLoading();
         
-        const response = await fetch(`${API_URL}/items`);
-        const data = await response.json();
-        
-        if (data.success) {
-            filteredItems = data.items;
-            applyFilters();
-        } else {
-            showError('Failed to load items');
-        }
+        // Cached list, refreshed with only the rows changed since the last visit
+        filteredItems = await fetchItemsWithCache('itemsCache');
+        applyFilters();
     } catch (error) {
         console.error('Error loading items:', error);
         showError('Network error. Please check if the Flask server is running on port 5000.');
     }
 }
 
+// Fill a <datalist> with typeahead suggestions for the input's current value
+async function loadSuggestions(input, listId, kinds) {
+    const list = document.getElementById(listId);
+    const query = input.value.trim();
+    if (!list) return;
+    if (!query) {
+        list.innerHTML = '';
+        return;
+    }
+    try {
+        const response = await fetch(`${API_URL}/suggest?q=${encodeURIComponent(query)}&kinds=${kinds}`);
+        const data = await response.json();
+        if (data.success && input.value.trim() === query) {
+            // Title suggestions complete the last word, keep the words before it
+            const head = query.includes(' ') ? query.slice(0, query.lastIndexOf(' ') + 1) : '';
+            list.innerHTML = data.suggestions.map(s => {
+                const value = s.kind === 'title' ? head + s.text : s.text;
+                return `<option value="${value.replace(/"/g, '&quot;')}"></option>`;
+            }).join('');
+        }
+    } catch (error) {
+        console.error('Error loading suggestions:', error);
+    }
+}
+
 // Debounce function for search inputs
 function debounce(func, wait) {
     let timeout;
@@ -221,6 +244,44 @@ function clearAllFilters() {
     showToast('Filters cleared', 'info');
 }
 
+// Subscribe to new items matching the current filters
+async function saveCurrentSearch() {
+    const userData = JSON.parse(localStorage.getItem('userData') || sessionStorage.getItem('userData') || 'null');
+    if (!userData || !userData.id) {
+        showToast('Please log in to save searches', 'error');
+        return;
+    }
+
+    const search = {
+        keywords: searchInput ? searchInput.value.trim() : '',
+        status: statusFilter ? statusFilter.value : '',
+        category: categoryFilter ? categoryFilter.value : '',
+        location: locationFilter ? locationFilter.value.trim() : ''
+    };
+    search.name = [search.keywords, search.category, search.location].filter(Boolean).join(', ');
+    if (!search.name) {
+        showToast('Enter keywords, a category or a location first', 'error');
+        return;
+    }
+
+    try {
+        const response = await fetch(`${API_URL}/users/${userData.id}/saved-searches`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(search)
+        });
+        const data = await response.json();
+        if (data.success) {
+            showToast("Search saved. We'll notify you about new matching items.", 'success');
+        } else {
+            showToast(data.error || 'Could not save search', 'error');
+        }
+    } catch (error) {
+        console.error('Error saving search:', error);
+        showToast('Could not save search', 'error');
+    }
+}
+
 // Open item detail page
 function openItemDetail(itemId) {
     localStorage.setItem('selectedItemId', itemId);
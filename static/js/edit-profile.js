@@ -176,6 +176,9 @@ function saveProfile() {
             showPhone: formData.get('showPhone') === 'on'
         }
     };
+    if (currentUser.version) {
+        updatedUser.version = currentUser.version;
+    }
     
     // Send update to API
     fetch(`/api/users/${currentUser.id}`, {
@@ -189,7 +192,7 @@ function saveProfile() {
     .then(data => {
         if (data.success) {
             // Update local storage with new data
-            const newUserData = { ...currentUser, ...updatedUser };
+            const newUserData = { ...currentUser, ...updatedUser, version: data.version };
             const storageKey = sessionStorage.getItem('userData') ? 'sessionStorage' : 'localStorage';
             
             if (storageKey === 'sessionStorage') {
@@ -161,6 +161,77 @@ function formatItemDate(date) {
     }
 }
 
+// Item list cache with delta sync
+// The first load fetches the full list from /api/items; later loads send the
+// saved sync token as ?updated_since= and only receive changed rows plus the
+// ids of deleted items, which are merged into the cached list.
+async function fetchItemsWithCache(cacheKey, query = '') {
+    let cache = null;
+    try {
+        cache = JSON.parse(localStorage.getItem(cacheKey));
+    } catch (error) {
+        cache = null;
+    }
+
+    if (cache && cache.token && Array.isArray(cache.items)) {
+        const separator = query ? '&' : '';
+        const response = await fetch(`/api/items?${query}${separator}updated_since=${encodeURIComponent(cache.token)}`);
+        const data = await response.json();
+        if (data.success && !data.full_sync_required) {
+            const byId = new Map(cache.items.map(item => [item.id, item]));
+            data.deleted.forEach(id => byId.delete(id));
+            data.items.forEach(item => byId.set(item.id, item));
+            const items = [...byId.values()].sort((a, b) => b.date_reported.localeCompare(a.date_reported));
+            saveItemsCache(cacheKey, items, data.sync_token);
+            return items;
+        }
+    }
+
+    // Full load in the compact columnar format
+    const response = await fetch(`/api/items?${query}${query ? '&' : ''}format=columnar`);
+    const data = await response.json();
+    if (!data.success) {
+        throw new Error(data.error || 'Failed to load items');
+    }
+    const items = decodeColumnarItems(data.items);
+    saveItemsCache(cacheKey, items, data.sync_token);
+    return items;
+}
+
+// Rebuild row objects from a ?format=columnar payload (see core/columnar.py)
+function decodeColumnarItems(payload) {
+    const columns = payload.fields.map(field => {
+        const column = payload.columns[field];
+        if (Array.isArray(column)) {
+            return column;
+        }
+        if (column.dict) {
+            return column.codes.map(code => column.dict[code]);
+        }
+        // Delta-encoded epoch milliseconds -> ISO timestamps
+        let total = 0;
+        return column.delta.map(delta => new Date(total += delta).toISOString());
+    });
+    const items = new Array(payload.length);
+    for (let row = 0; row < payload.length; row++) {
+        const item = {};
+        payload.fields.forEach((field, index) => {
+            item[field] = columns[index][row];
+        });
+        items[row] = item;
+    }
+    return items;
+}
+
+function saveItemsCache(cacheKey, items, token) {
+    try {
+        localStorage.setItem(cacheKey, JSON.stringify({ token, items }));
+    } catch (error) {
+        // Storage full or disabled: next load simply fetches the full list
+        localStorage.removeItem(cacheKey);
+    }
+}
+
 // Open item detail (for homepage)
 function openItemDetail(itemId) {
     localStorage.setItem('selectedItemId', itemId);
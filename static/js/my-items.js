@@ -4,6 +4,9 @@ let currentEditingItem = null;
 let currentDeletingItem = null;
 let myItemsData = [];
 
+// Items per dashboard response (server maximum)
+const DASHBOARD_LIMIT = 50;
+
 document.addEventListener('DOMContentLoaded', () => {
     loadMyItems();
 });
@@ -17,17 +20,26 @@ function loadMyItems() {
         return;
     }
     
-    // Fetch items from API
-    fetch(`/api/items?user_id=${currentUser.id}`)
+    // One dashboard request gives the list, the tab counts and the unread badge.
+    // Users with more items than fit in it fall back to the delta-synced list.
+    fetch(`/api/users/${currentUser.id}/dashboard?include=stats,items,notifications&limit=${DASHBOARD_LIMIT}`)
         .then(response => response.json())
         .then(data => {
-            if (data.success) {
-                myItemsData = data.items;
-                displayItems(myItemsData);
-                updateTabCounts();
-            } else {
-                showToast('Failed to load items', 'error');
+            if (!data.success) {
+                throw new Error(data.error);
+            }
+            updateTabCounts(data.stats);
+            if (data.notifications.length > 0) {
+                updateNotificationUI(data.notifications);
             }
+            if (data.stats.total > data.items.length) {
+                return fetchItemsWithCache(`myItemsCache:${currentUser.id}`, `user_id=${currentUser.id}`);
+            }
+            return data.items;
+        })
+        .then(items => {
+            myItemsData = items;
+            displayItems(myItemsData);
         })
         .catch(error => {
             console.error('Error loading items:', error);
@@ -132,11 +144,11 @@ function displayItems(allItems) {
     `).join('');
 }
 
-function updateTabCounts() {
-    const totalCount = myItemsData.length;
-    const lostCount = myItemsData.filter(item => item.status === 'lost').length;
-    const foundCount = myItemsData.filter(item => item.status === 'found').length;
-    const recoveredCount = myItemsData.filter(item => item.status === 'recovered').length;
+function updateTabCounts(stats) {
+    const totalCount = stats.total;
+    const lostCount = stats.lost;
+    const foundCount = stats.found;
+    const recoveredCount = stats.recovered;
     
     // Update tab labels
     const allTab = document.querySelector('[data-tab="all"]');
@@ -188,14 +200,21 @@ function markAsRecovered(itemId) {
         return;
     }
     
+    // Send the version we displayed so a concurrent edit is reported (409) instead of overwritten
+    const item = myItemsData.find(i => i.id === itemId);
     fetch(`/api/items/${itemId}/recover`, {
-        method: 'POST'
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(item && item.version ? { version: item.version } : {})
     })
     .then(response => response.json())
     .then(data => {
         if (data.success) {
             showToast('Item marked as recovered!', 'success');
             loadMyItems(); // Reload list
+        } else if (data.version) {
+            showToast('This item was changed elsewhere. Reloading...', 'error');
+            loadMyItems();
         } else {
             showToast(data.error || 'Failed to update status', 'error');
         }
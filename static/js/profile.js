@@ -126,13 +126,22 @@ function updateStats() {
         return;
     }
     
-    // Fetch real stats from API
-    fetch(`/api/users/${currentUser.id}/stats`)
+    // Fetch the profile and stats in one request
+    fetch(`/api/users/${currentUser.id}/dashboard?include=user,stats`)
         .then(response => response.json())
         .then(data => {
             if (data.success) {
                 const stats = data.stats;
                 updateStatDOM(stats.total, stats.lost, stats.found, stats.recovered);
+                updateProfileDisplay({
+                    name: data.user.name,
+                    email: data.user.email,
+                    phone: data.user.phone || currentUser.phone,
+                    location: data.user.location || currentUser.location,
+                    joinDate: new Date(data.user.join_date).toLocaleDateString('en-US', {
+                        year: 'numeric', month: 'long', day: 'numeric'
+                    })
+                });
             } else {
                 console.error('Failed to load stats:', data.error);
             }